@@ -0,0 +1,97 @@
+import pytest
+from types import SimpleNamespace
+from src.weather_api.config.loader import CacheSettings
+from src.weather_api.database import cache
+from src.weather_api.database.cache import TTLCache, cached
+
+
+@pytest.fixture
+def cache_settings(monkeypatch):
+    """Replace the process-wide config with one that only caches get_consensus"""
+    settings = CacheSettings(max_entries=10, ttl_seconds={'get_consensus': 60})
+    config = SimpleNamespace(database=SimpleNamespace(cache=settings))
+    monkeypatch.setattr(cache, 'get_config', lambda: config)
+    cache.query_cache.clear()
+    yield settings
+    cache.query_cache.clear()
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.calls = 0
+
+    @cached
+    def get_consensus(self, locations, cutoff='2025-09-06', fresh=False):
+        self.calls += 1
+        return [{'locations': list(locations), 'cutoff': cutoff, 'fresh': fresh}]
+
+    @cached
+    def get_uncached(self):
+        self.calls += 1
+        return []
+
+
+class TestTTLCache:
+    def test_hit_and_miss(self):
+        """Test that a stored value is returned until it expires"""
+        ttl_cache = TTLCache()
+        assert ttl_cache.get('q', 'key') == (False, None)
+        ttl_cache.set('key', [1], ttl=60)
+        assert ttl_cache.get('q', 'key') == (True, [1])
+        assert ttl_cache.stats() == {'q': {'hits': 1, 'misses': 1}}
+
+    def test_expired_entry_is_a_miss(self):
+        """Test that entries past their TTL are not returned"""
+        ttl_cache = TTLCache()
+        ttl_cache.set('key', [1], ttl=-1)
+        assert ttl_cache.get('q', 'key') == (False, None)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        ttl_cache = TTLCache(max_entries=2)
+        ttl_cache.set('a', 1, ttl=60)
+        ttl_cache.set('b', 2, ttl=60)
+        ttl_cache.get('q', 'a')
+        ttl_cache.set('c', 3, ttl=60)
+        assert ttl_cache.get('q', 'b') == (False, None)
+        assert ttl_cache.get('q', 'a') == (True, 1)
+
+    def test_values_are_copied(self):
+        """Test that mutating a returned value does not change the cache"""
+        ttl_cache = TTLCache()
+        ttl_cache.set('key', [{'date': 'a'}], ttl=60)
+        ttl_cache.get('q', 'key')[1][0]['date'] = 'b'
+        assert ttl_cache.get('q', 'key')[1][0]['date'] == 'a'
+
+
+class TestCachedDecorator:
+    def test_repeated_call_served_from_cache(self, cache_settings):
+        """Test that equivalent calls hit the cache across Database instances"""
+        first, second = FakeDatabase(), FakeDatabase()
+        assert first.get_consensus(['KMIA', 'KNYC']) == second.get_consensus(('KMIA', 'KNYC'), '2025-09-06')
+        assert first.calls == 1
+        assert second.calls == 0
+
+    def test_different_arguments_miss(self, cache_settings):
+        """Test that different arguments are cached separately"""
+        db = FakeDatabase()
+        db.get_consensus(['KNYC'])
+        db.get_consensus(['KNYC'], '2025-09-10')
+        assert db.calls == 2
+
+    def test_query_without_ttl_is_not_cached(self, cache_settings):
+        """Test that queries without a configured TTL always run"""
+        db = FakeDatabase()
+        db.get_uncached()
+        db.get_uncached()
+        assert db.calls == 2
+
+    def test_fresh_call_bypasses_cache(self, cache_settings):
+        """Test that fresh=True neither reads nor stores a cached result"""
+        db = FakeDatabase()
+        db.get_consensus(['KNYC'])
+        assert db.get_consensus(['KNYC'], fresh=True)[0]['fresh'] is True
+        db.get_consensus(['KMIA'], '2025-09-06', True)
+        db.get_consensus(['KMIA'])
+        assert db.calls == 4
+        assert cache.query_cache.stats() == {'get_consensus': {'hits': 0, 'misses': 2}}
@@ -0,0 +1,238 @@
+import time
+import threading
+import pytest
+from types import SimpleNamespace
+from src.weather_api.config.loader import CoalescingSettings
+from src.weather_api.database import coalescing
+from src.weather_api.database.coalescing import CoalescedCallError, SingleFlight, coalesced
+
+
+@pytest.fixture
+def coalescing_settings(monkeypatch):
+    """Replace the process-wide config with one that only coalesces get_highs"""
+    settings = CoalescingSettings(enabled=True, queries={'get_highs': True})
+    config = SimpleNamespace(database=SimpleNamespace(coalescing=settings))
+    monkeypatch.setattr(coalescing, 'get_config', lambda: config)
+    coalescing.single_flight.reset_stats()
+    yield settings
+    coalescing.single_flight.reset_stats()
+
+
+class FakeDatabase:
+    def __init__(self, release):
+        self.release = release
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    @coalesced
+    def get_highs(self, location, cutoff='2025-09-06', fresh=False):
+        with self.lock:
+            self.calls += 1
+        self.release.wait(timeout=5)
+        return [{'location': location, 'cutoff': cutoff}]
+
+    @coalesced
+    def get_lows(self, location):
+        with self.lock:
+            self.calls += 1
+        return [{'location': location}]
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'timed out waiting for condition'
+        time.sleep(0.001)
+
+
+def run_concurrently(fns):
+    results = [None] * len(fns)
+
+    def target(i):
+        results[i] = fns[i]()
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(len(fns))]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class TestSingleFlight:
+    def test_concurrent_identical_calls_share_execution(self):
+        """Test that waiters receive the leader's result without re-running it"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return {'value': 1}
+
+        leader, results = run_concurrently([lambda: flight.do('q', 'key', work)])
+        assert started.wait(timeout=5)
+        followers, follower_results = run_concurrently([lambda: flight.do('q', 'key', work)] * 3)
+        wait_for(lambda: flight.stats()['q']['coalesced'] == 3)
+        release.set()
+        for thread in leader + followers:
+            thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert results[0] == {'value': 1}
+        assert follower_results == [{'value': 1}] * 3
+        assert flight.stats() == {'q': {'executed': 1, 'coalesced': 3}}
+
+    def test_results_are_copied_when_shared(self):
+        """Test that callers sharing an execution can mutate their result without affecting others"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        shared = [{'date': 'a'}]
+
+        def work():
+            started.set()
+            release.wait(timeout=5)
+            return shared
+
+        leader, results = run_concurrently([lambda: flight.do('q', 'key', work)])
+        assert started.wait(timeout=5)
+        followers, follower_results = run_concurrently([lambda: flight.do('q', 'key', work)])
+        wait_for(lambda: flight.stats()['q']['coalesced'] == 1)
+        release.set()
+        for thread in leader + followers:
+            thread.join(timeout=5)
+
+        results[0][0]['date'] = 'b'
+        assert follower_results[0] == [{'date': 'a'}]
+        assert results[0] is not shared and follower_results[0] is not shared
+
+    def test_unshared_result_is_not_copied(self):
+        """Test that a leader nobody waited on gets fn's result as-is"""
+        flight = SingleFlight()
+        result = [{'date': 'a'}]
+        assert flight.do('q', 'key', lambda: result) is result
+
+    def test_exception_is_propagated(self):
+        """Test that the leader's exception is raised and the key is released"""
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError):
+            flight.do('q', 'key', fail)
+        assert flight.do('q', 'key', lambda: 2) == 2
+
+    def run_failing_leader(self, flight, error):
+        """Start a leader that raises error once three waiters have joined; return the waiters' exceptions"""
+        release = threading.Event()
+        errors = []
+
+        def work():
+            release.wait(timeout=5)
+            raise error
+
+        def leader():
+            try:
+                flight.do('q', 'key', work)
+            except BaseException:
+                pass
+
+        def follower():
+            try:
+                flight.do('q', 'key', work)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=leader)]
+        threads[0].start()
+        wait_for(lambda: flight.stats().get('q', {}).get('executed') == 1)
+        threads += [threading.Thread(target=follower) for _ in range(3)]
+        for thread in threads[1:]:
+            thread.start()
+        wait_for(lambda: flight.stats()['q']['coalesced'] == 3)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        return errors
+
+    def test_waiters_get_their_own_exception(self):
+        """Test that each waiter raises a separate copy chained to the leader's error"""
+        flight = SingleFlight()
+        original = AttributeError('Filename missing.sql not found')
+        errors = self.run_failing_leader(flight, original)
+
+        assert len(errors) == 3
+        assert all(type(e) is AttributeError and e.args == original.args for e in errors)
+        assert all(e is not original and e.__cause__ is original for e in errors)
+        assert len({id(e) for e in errors}) == 3
+
+    def test_base_exception_in_leader_fails_waiters(self):
+        """Test that waiters raise instead of returning None when the leader dies"""
+        flight = SingleFlight()
+        errors = self.run_failing_leader(flight, SystemExit(1))
+
+        assert len(errors) == 3
+        assert all(isinstance(e, CoalescedCallError) for e in errors)
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test that a finished call is executed again"""
+        flight = SingleFlight()
+        assert flight.do('q', 'key', lambda: 1) == 1
+        assert flight.do('q', 'key', lambda: 2) == 2
+        assert flight.stats()['q'] == {'executed': 2, 'coalesced': 0}
+
+
+class TestCoalescedDecorator:
+    def test_normalized_arguments_share_execution(self, coalescing_settings):
+        """Test that positional, keyword and default spellings are coalesced"""
+        release = threading.Event()
+        db = FakeDatabase(release)
+
+        threads, results = run_concurrently([
+            lambda: db.get_highs('KNYC'),
+            lambda: db.get_highs('KNYC', '2025-09-06'),
+            lambda: db.get_highs(location='KNYC', cutoff='2025-09-06'),
+        ])
+        wait_for(lambda: sum(coalescing.single_flight.stats().get('get_highs', {}).values()) == 3)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert db.calls == 1
+        assert results == [[{'location': 'KNYC', 'cutoff': '2025-09-06'}]] * 3
+
+    def test_different_arguments_run_separately(self, coalescing_settings):
+        """Test that calls with different arguments are not coalesced"""
+        release = threading.Event()
+        release.set()
+        db = FakeDatabase(release)
+
+        assert db.get_highs('KNYC') == [{'location': 'KNYC', 'cutoff': '2025-09-06'}]
+        assert db.get_highs('KMIA') == [{'location': 'KMIA', 'cutoff': '2025-09-06'}]
+        assert db.calls == 2
+
+    def test_disabled_query_bypasses_coalescing(self, coalescing_settings):
+        """Test that queries not enabled in config are called directly"""
+        db = FakeDatabase(threading.Event())
+        assert db.get_lows('KNYC') == [{'location': 'KNYC'}]
+        assert 'get_lows' not in coalescing.single_flight.stats()
+
+    def test_fresh_calls_run_separately(self, coalescing_settings):
+        """Test that fresh=True calls never join an execution already in flight"""
+        release = threading.Event()
+        db = FakeDatabase(release)
+
+        threads, results = run_concurrently([
+            lambda: db.get_highs('KNYC', fresh=True),
+            lambda: db.get_highs('KNYC', '2025-09-06', True),
+        ])
+        wait_for(lambda: db.calls == 2)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert results == [[{'location': 'KNYC', 'cutoff': '2025-09-06'}]] * 2
+        assert 'get_highs' not in coalescing.single_flight.stats()
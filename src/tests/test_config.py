@@ -1,7 +1,9 @@
+import os
 import pytest
 import yaml
 from pathlib import Path
-from src.weather_api.config.loader import Config
+from src.weather_api.config import loader
+from src.weather_api.config.loader import Config, ConfigError
 
 
 class TestConfig:
@@ -31,6 +33,12 @@ class TestConfig:
         assert config.database_config['port'] == '5432'
         assert config.database_config['dbname'] == 'weather_forecasts'
 
+    def test_kalshi_locations_are_station_ids(self):
+        """Test that Kalshi locations use the station IDs of the forecast and observation endpoints"""
+        config = Config()
+        assert 'KMIA' in config.kalshi.locations
+        assert all(len(location) == 4 and location.startswith('K') for location in config.kalshi.locations)
+
     def test_load_yaml_method(self):
         """Test that load_yaml method works correctly"""
         config = Config()
@@ -40,3 +48,111 @@ class TestConfig:
         assert loaded_data is not None
         assert 'database' in loaded_data
         assert isinstance(loaded_data['database'], dict)
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Write a minimal, valid pair of config files to a temporary directory"""
+    (tmp_path / 'database.yaml').write_text(
+        'database:\n  host: "localhost"\n  port: "5432"\n  dbname: "weather_forecasts"\n'
+    )
+    (tmp_path / 'kalshi.yaml').write_text(
+        'kalshi:\n  base_url: "https://kalshi.test/"\n'
+        '  locations:\n    KNYC:\n      event-prefix: "KXHIGHNY-"\n'
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def cached_config(config_dir, monkeypatch):
+    """Point the process-wide config at the temporary directory"""
+    monkeypatch.setattr(loader, 'CONFIG_DIR', config_dir)
+    monkeypatch.setattr(loader, 'RELOAD_CHECK_INTERVAL', 0)
+    loader.reset_config()
+    yield config_dir
+    loader.reset_config()
+
+
+class TestTypedConfig:
+    def test_typed_settings(self, config_dir):
+        """Test that YAML values are converted to typed settings"""
+        config = Config(config_dir, environ={})
+        assert config.database.port == 5432
+        assert config.database.user is None
+        assert config.kalshi.base_url == 'https://kalshi.test'
+        assert config.kalshi.locations['KNYC']['event-prefix'] == 'KXHIGHNY-'
+
+    def test_environment_overrides(self, config_dir):
+        """Test that environment variables take precedence over YAML values"""
+        environ = {'POSTGRES_HOST': 'db.local', 'POSTGRES_USER': 'weather', 'POSTGRES_PASSWORD': 'secret'}
+        config = Config(config_dir, environ=environ)
+        assert config.database.host == 'db.local'
+        assert config.database.connection_kwargs()['user'] == 'weather'
+        assert config.database.connection_kwargs()['password'] == 'secret'
+
+    def test_connection_kwargs_omit_missing_credentials(self, config_dir):
+        """Test that unset credentials are not passed to the driver"""
+        kwargs = Config(config_dir, environ={}).database.connection_kwargs()
+        assert 'user' not in kwargs
+        assert 'password' not in kwargs
+
+    def test_replicas_from_environment(self, config_dir):
+        """Test that POSTGRES_REPLICAS is parsed into replica settings"""
+        config = Config(config_dir, environ={'POSTGRES_REPLICAS': 'replica0:5433, replica1'})
+        assert [(r.host, r.port) for r in config.database.replicas] == [('replica0', 5433), ('replica1', 5432)]
+        assert config.database.connection_kwargs(config.database.replicas[0])['port'] == 5433
+        assert config.database.connection_kwargs()['host'] == 'localhost'
+
+    def test_invalid_pool_size(self, config_dir):
+        """Test that a pool smaller than its minimum is rejected"""
+        (config_dir / 'database.yaml').write_text(
+            'database:\n  host: "localhost"\n  port: "5432"\n  dbname: "weather_forecasts"\n'
+            '  pool:\n    min_size: 5\n    max_size: 2\n'
+        )
+        with pytest.raises(ConfigError):
+            Config(config_dir, environ={})
+
+    def test_invalid_port(self, config_dir):
+        """Test that a non-numeric port is rejected"""
+        with pytest.raises(ConfigError):
+            Config(config_dir, environ={'POSTGRES_PORT': 'abc'})
+
+    def test_missing_required_key(self, config_dir):
+        """Test that a missing required key is rejected"""
+        (config_dir / 'database.yaml').write_text('database:\n  host: "localhost"\n')
+        with pytest.raises(ConfigError):
+            Config(config_dir, environ={})
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing config file raises ConfigError"""
+        with pytest.raises(ConfigError):
+            Config(tmp_path, environ={})
+
+
+class TestGetConfig:
+    def test_config_is_cached(self, cached_config):
+        """Test that get_config returns the same instance while files are unchanged"""
+        assert loader.get_config() is loader.get_config()
+
+    def test_reload_on_mtime_change(self, cached_config):
+        """Test that a changed file is picked up without a restart"""
+        first = loader.get_config()
+        database_yaml = cached_config / 'database.yaml'
+        database_yaml.write_text(
+            'database:\n  host: "otherhost"\n  port: "5433"\n  dbname: "weather_forecasts"\n'
+        )
+        os.utime(database_yaml, ns=(first.mtimes['database'] + 10**9,) * 2)
+
+        second = loader.get_config()
+        assert second is not first
+        assert second.database.host == 'otherhost'
+        assert second.database.port == 5433
+
+    def test_invalid_reload_keeps_previous_config(self, cached_config):
+        """Test that an invalid edit does not replace the working config"""
+        first = loader.get_config()
+        database_yaml = cached_config / 'database.yaml'
+        database_yaml.write_text('database:\n  host: "otherhost"\n  port: "not-a-port"\n  dbname: "x"\n')
+        os.utime(database_yaml, ns=(first.mtimes['database'] + 10**9,) * 2)
+
+        assert loader.get_config() is first
@@ -0,0 +1,192 @@
+import os
+import pytest
+import psycopg
+from pathlib import Path
+from psycopg import sql
+from psycopg.rows import dict_row
+from unittest.mock import Mock, patch
+from datetime import date
+from src.weather_api.app import create_app
+from src.weather_api.database.snapshot_selection import SnapshotPolicy, forecast_snapshots
+
+CONSENSUS_QUERY = (Path(__file__).parent.parent / 'weather_api' / 'database' / 'sql_files' /
+                   'get_consensus_forecast.sql').read_text()
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def mock_db():
+    """Mock database instance"""
+    with patch('src.weather_api.api.weather.Database') as mock:
+        db_instance = Mock()
+        mock.return_value = db_instance
+        yield db_instance
+
+
+def consensus_row(location, day, mean, weighted_mean=None):
+    return {
+        'location': location,
+        'date': date(2025, 9, day),
+        'provider_count': 3,
+        'providers': ['nws', 'open_meteo', 'tomorrow'],
+        'mean': mean,
+        'median': mean,
+        'min': mean - 2,
+        'max': mean + 2,
+        'spread': 4.0,
+        'stddev': 1.6,
+        'weighted_mean': weighted_mean
+    }
+
+
+class TestForecastConsensusEndpoint:
+    def test_missing_locations(self, client):
+        """Test that endpoint returns 400 when locations is missing"""
+        response = client.get('/forecast/consensus')
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'locations' in data['error']
+
+    def test_blank_locations(self, client):
+        """Test that a list of only separators counts as missing"""
+        response = client.get('/forecast/consensus?locations=,,')
+        assert response.status_code == 400
+
+    def test_success_grouped_by_location(self, client, mock_db):
+        """Test that statistics are returned per location and day"""
+        mock_db.get_consensus_forecast.return_value = [
+            consensus_row('KMIA', 7, 90.0),
+            consensus_row('KNYC', 7, 80.0),
+            consensus_row('KNYC', 8, 82.0),
+        ]
+
+        response = client.get('/forecast/consensus?locations=KNYC,KMIA')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['locations'] == ['KMIA', 'KNYC']
+        assert data['cutoff'] == '2025-09-06'
+        assert data['weighted'] is False
+        assert len(data['consensus']['KNYC']) == 2
+        day = data['consensus']['KNYC'][0]
+        assert day['date'] == '2025-09-07'
+        assert day['mean'] == 80.0
+        assert day['spread'] == 4.0
+        assert day['providers'] == ['nws', 'open_meteo', 'tomorrow']
+        assert 'weighted_mean' not in day
+        assert 'location' not in day
+
+    def test_locations_normalized_for_single_query(self, client, mock_db):
+        """Test that locations are deduplicated and sorted into one database call"""
+        mock_db.get_consensus_forecast.return_value = []
+
+        response = client.get('/forecast/consensus?locations=KNYC, KMIA,KNYC&cutoff=2025-09-10')
+
+        assert response.status_code == 200
+        mock_db.get_consensus_forecast.assert_called_once_with(
+            ['KMIA', 'KNYC'], '2025-09-10', False, policy=SnapshotPolicy()
+        )
+        assert response.get_json()['consensus'] == {'KMIA': [], 'KNYC': []}
+
+    def test_weighted(self, client, mock_db):
+        """Test that the skill-weighted mean is returned when requested"""
+        mock_db.get_consensus_forecast.return_value = [consensus_row('KNYC', 7, 80.0, weighted_mean=79.4)]
+
+        response = client.get('/forecast/consensus?locations=KNYC&weighted=true')
+
+        assert response.status_code == 200
+        mock_db.get_consensus_forecast.assert_called_once_with(['KNYC'], '2025-09-06', True, policy=SnapshotPolicy())
+        data = response.get_json()
+        assert data['weighted'] is True
+        assert data['consensus']['KNYC'][0]['weighted_mean'] == 79.4
+
+    def test_database_error(self, client, mock_db):
+        """Test that database errors are handled correctly"""
+        mock_db.get_consensus_forecast.side_effect = Exception('Database connection failed')
+
+        response = client.get('/forecast/consensus?locations=KNYC')
+
+        assert response.status_code == 500
+        assert 'Database error' in response.get_json()['error']
+
+
+@pytest.mark.skipif(
+    not os.environ.get('TEST_POSTGRES_PRIMARY'),
+    reason='Set TEST_POSTGRES_PRIMARY=host:port to run'
+)
+class TestConsensusQueryIntegration:
+    """Run the consensus query against temporary tables on a local Postgres"""
+
+    @pytest.fixture
+    def conn(self):
+        host, _, port = os.environ['TEST_POSTGRES_PRIMARY'].partition(':')
+        with psycopg.connect(host=host, port=int(port or 5432),
+                             dbname=os.environ.get('POSTGRES_DB', 'postgres'),
+                             user=os.environ.get('POSTGRES_USER'),
+                             password=os.environ.get('POSTGRES_PASSWORD'),
+                             row_factory=dict_row) as conn:
+            # Temporary tables shadow the real ones for this session only
+            conn.execute('CREATE TEMP TABLE weather_forecasts '
+                         '(location TEXT, provider TEXT, timestamp TIMESTAMP, end_time TIMESTAMP, temperature REAL)')
+            conn.execute('CREATE TEMP TABLE observations (station_id TEXT, date DATE, value REAL, '
+                         'measurement_type TEXT, observation_type TEXT, service TEXT)')
+            yield conn
+
+    @staticmethod
+    def add_forecast(conn, provider, day, temperature):
+        conn.execute('INSERT INTO weather_forecasts VALUES (%s, %s, %s, %s, %s)',
+                     ('KNYC', provider, f'2025-09-{day:02d} 06:00', f'2025-09-{day:02d} 18:00', temperature))
+
+    @staticmethod
+    def add_observation(conn, day, value):
+        conn.execute("INSERT INTO observations VALUES ('KNYC', %s, %s, 'temperature', 'max', 'CLI')",
+                     (date(2025, 9, day), value))
+
+    @staticmethod
+    def consensus(conn):
+        policy = SnapshotPolicy()
+        query = sql.SQL(CONSENSUS_QUERY).format(forecast_snapshots=forecast_snapshots(policy))
+        params = dict(policy.params(), locations=['KNYC'], cutoff='2025-09-06', weighted=True)
+        return {row['date'].day: row for row in conn.execute(query, params).fetchall()}
+
+    def test_without_history_weighted_mean_is_mean(self, conn):
+        """Test that providers are weighted equally when none has been scored yet"""
+        self.add_forecast(conn, 'a', 7, 80.0)
+        self.add_forecast(conn, 'b', 7, 84.0)
+
+        day = self.consensus(conn)[7]
+        assert day['weighted_mean'] == pytest.approx(day['mean'])
+
+    def test_new_provider_gets_average_error(self, conn):
+        """Test that a provider without history is weighted by the other providers' average error"""
+        self.add_forecast(conn, 'a', 7, 80.0)
+        self.add_forecast(conn, 'b', 7, 84.0)
+        self.add_observation(conn, 7, 81.0)
+        self.add_forecast(conn, 'a', 8, 80.0)
+        self.add_forecast(conn, 'b', 8, 90.0)
+        self.add_forecast(conn, 'c', 8, 70.0)
+
+        # Errors on day 8: a=1, b=3, and c has none so it gets their average, 2
+        weights = {80.0: 1 / 1, 90.0: 1 / 3, 70.0: 1 / 2}
+        expected = sum(high * weight for high, weight in weights.items()) / sum(weights.values())
+        assert self.consensus(conn)[8]['weighted_mean'] == pytest.approx(expected)
+
+    def test_cutoff_day_observation_scores_providers(self, conn):
+        """Test that the observed high on the cutoff day counts towards provider skill"""
+        self.add_forecast(conn, 'a', 6, 80.0)
+        self.add_forecast(conn, 'b', 6, 84.0)
+        self.add_observation(conn, 6, 81.0)
+        self.add_forecast(conn, 'a', 7, 80.0)
+        self.add_forecast(conn, 'b', 7, 90.0)
+
+        # Errors on the 6th: a=1, b=3
+        expected = (80.0 / 1 + 90.0 / 3) / (1 / 1 + 1 / 3)
+        assert self.consensus(conn)[7]['weighted_mean'] == pytest.approx(expected)
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import Mock, patch
 from src.weather_api.app import create_app
+from src.weather_api.database.snapshot_selection import SnapshotPolicy
 
 
 @pytest.fixture
@@ -72,7 +73,9 @@ class TestForecastHighsEndpoint:
         assert data['cutoff'] == '2025-09-10'
 
         # Verify the database method was called with correct parameters
-        mock_db.get_forecasted_highs.assert_called_once_with('KNYC', 'test_provider', '2025-09-10')
+        mock_db.get_forecasted_highs.assert_called_once_with(
+            'KNYC', 'test_provider', '2025-09-10', policy=SnapshotPolicy()
+        )
 
     def test_forecast_highs_database_error(self, client, mock_db):
         """Test that database errors are handled correctly"""
@@ -95,3 +98,34 @@ class TestForecastHighsEndpoint:
         data = response.get_json()
         assert 'error' in data
         assert 'Query file not found' in data['error']
+
+    def test_forecast_highs_policy_parameters(self, client, mock_db):
+        """Test that the snapshot selection policy is parsed and echoed back"""
+        mock_db.get_forecasted_highs.return_value = []
+
+        response = client.get('/forecast/highs?location=KNYC&provider=test_provider&policy=lead_time&lead_hours=36')
+
+        assert response.status_code == 200
+        assert response.get_json()['policy'] == {'policy': 'lead_time', 'lead_hours': 36}
+        mock_db.get_forecasted_highs.assert_called_once_with(
+            'KNYC', 'test_provider', '2025-09-06', policy=SnapshotPolicy(kind='lead_time', lead_hours=36)
+        )
+
+    def test_forecast_highs_default_policy(self, client, mock_db):
+        """Test that the default policy is the earliest forecast after 02:00"""
+        mock_db.get_forecasted_highs.return_value = []
+
+        response = client.get('/forecast/highs?location=KNYC&provider=test_provider')
+
+        assert response.get_json()['policy'] == {'policy': 'earliest_after', 'hour': 2}
+
+    def test_forecast_highs_invalid_policy(self, client, mock_db):
+        """Test that unknown policies and bad hours are rejected"""
+        response = client.get('/forecast/highs?location=KNYC&provider=test_provider&policy=median')
+        assert response.status_code == 400
+        assert 'policy' in response.get_json()['error']
+
+        response = client.get('/forecast/highs?location=KNYC&provider=test_provider&policy=latest_before&hour=25')
+        assert response.status_code == 400
+        assert 'hour' in response.get_json()['error']
+        mock_db.get_forecasted_highs.assert_not_called()
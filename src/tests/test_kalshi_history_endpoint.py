@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime, date
+from src.weather_api.app import create_app
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask app"""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def mock_db():
+    """Mock database instance"""
+    with patch('src.weather_api.api.kalshi.Database') as mock:
+        db_instance = Mock()
+        mock.return_value = db_instance
+        yield db_instance
+
+
+def snapshot(day, ticker, hour, yes_bid):
+    return {
+        'date': date(2025, 9, day),
+        'ticker': ticker,
+        'floor_strike': 80.0,
+        'cap_strike': 81.0,
+        'captured_at': datetime(2025, 9, day, hour, 0, 0),
+        'yes_bid': yes_bid,
+        'yes_ask': yes_bid + 2,
+        'last_price': yes_bid + 1,
+        'volume': 10,
+        'open_interest': 5
+    }
+
+
+class TestKalshiHistoryEndpoint:
+    def test_missing_location(self, client):
+        """Test that endpoint returns 400 when location is missing"""
+        response = client.get('/kalshi/history')
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'location' in data['error']
+
+    @pytest.mark.parametrize('interval', ['abc', '0', '1441', '99999999999'])
+    def test_invalid_interval(self, client, mock_db, interval):
+        """Test that a non-numeric, zero or longer than one day interval is rejected"""
+        response = client.get(f'/kalshi/history?location=KNYC&interval_minutes={interval}')
+        assert response.status_code == 400
+        assert 'interval_minutes' in response.get_json()['error']
+        mock_db.get_kalshi_price_history.assert_not_called()
+
+    def test_history_grouped_by_date_and_ticker(self, client, mock_db):
+        """Test that snapshots are grouped per date and market"""
+        mock_db.get_kalshi_price_history.return_value = [
+            snapshot(7, 'KXHIGHNY-25SEP07-B80.5', 9, 40),
+            snapshot(7, 'KXHIGHNY-25SEP07-B80.5', 10, 45),
+            snapshot(7, 'KXHIGHNY-25SEP07-B82.5', 9, 20),
+            snapshot(8, 'KXHIGHNY-25SEP08-B80.5', 9, 30),
+        ]
+
+        response = client.get('/kalshi/history?location=KNYC')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['location'] == 'KNYC'
+        assert data['cutoff'] == '2025-09-06'
+        assert [(h['date'], h['ticker']) for h in data['history']] == [
+            ('2025-09-07', 'KXHIGHNY-25SEP07-B80.5'),
+            ('2025-09-07', 'KXHIGHNY-25SEP07-B82.5'),
+            ('2025-09-08', 'KXHIGHNY-25SEP08-B80.5'),
+        ]
+        assert len(data['history'][0]['snapshots']) == 2
+        assert data['history'][0]['snapshots'][1]['yes_bid'] == 45
+        assert data['history'][0]['snapshots'][0]['captured_at'] == '2025-09-07T09:00:00'
+
+    def test_parameters_passed_to_database(self, client, mock_db):
+        """Test that filters and interval are passed through"""
+        mock_db.get_kalshi_price_history.return_value = []
+
+        response = client.get('/kalshi/history?location=KNYC&cutoff=2025-09-10'
+                              '&ticker=KXHIGHNY-25SEP11-B80.5&interval_minutes=5')
+
+        assert response.status_code == 200
+        mock_db.get_kalshi_price_history.assert_called_once_with(
+            'KNYC', '2025-09-10', 'KXHIGHNY-25SEP11-B80.5', 300
+        )
+
+    def test_database_error(self, client, mock_db):
+        """Test that database errors are handled correctly"""
+        mock_db.get_kalshi_price_history.side_effect = Exception('Database connection failed')
+
+        response = client.get('/kalshi/history?location=KNYC')
+
+        assert response.status_code == 500
+        assert 'Database error' in response.get_json()['error']
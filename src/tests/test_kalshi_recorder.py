@@ -0,0 +1,210 @@
+import time
+import threading
+import pytest
+import requests
+from dataclasses import replace
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import Mock
+from src.weather_api.external import kalshi_recorder
+from src.weather_api.external.kalshi_recorder import KalshiRecorder, SnapshotBuffer, parse_event_date
+
+
+def market(ticker, event_ticker='KXHIGHNY-25SEP07', **fields):
+    return dict({'ticker': ticker, 'event_ticker': event_ticker, 'yes_bid': 40, 'yes_ask': 44,
+                 'last_price': 42, 'volume': 100, 'open_interest': 50,
+                 'floor_strike': 80, 'cap_strike': 81}, **fields)
+
+
+@pytest.fixture
+def recorder():
+    """Recorder with fake credentials, a mock database and canned Kalshi responses"""
+    db = Mock()
+    db.insert_kalshi_snapshots.side_effect = lambda rows: len(rows)
+    recorder = KalshiRecorder(database_factory=lambda: db, credentials=(None, 'key-id'))
+    recorder.mock_db = db
+
+    def fake_request(path, params=None):
+        if path.endswith('/orderbook'):
+            return {'orderbook': {'yes': [[40, 10]], 'no': [[56, 5]]}}
+        if params['series_ticker'] == 'KXHIGHNY':
+            return {'markets': [market('KXHIGHNY-25SEP07-B80.5'), market('KXHIGHNY-25SEP07-B82.5')]}
+        return {'markets': []}
+
+    recorder.request = Mock(side_effect=fake_request)
+    return recorder
+
+
+class TestParseEventDate:
+    def test_parse_event_date(self):
+        """Test that the settlement date is read from the event ticker"""
+        assert parse_event_date('KXHIGHNY-25SEP07') == date(2025, 9, 7)
+        assert parse_event_date('KXHIGHPHIL-25DEC31') == date(2025, 12, 31)
+
+
+class TestSnapshotBuffer:
+    def test_drain_returns_rows_in_order(self):
+        """Test that drain empties the buffer in insertion order"""
+        buffer = SnapshotBuffer(10)
+        buffer.add([1, 2])
+        buffer.add([3])
+        assert buffer.drain() == [1, 2, 3]
+        assert len(buffer) == 0
+
+    def test_overflow_drops_oldest(self):
+        """Test that a full buffer drops its oldest rows"""
+        buffer = SnapshotBuffer(3)
+        buffer.add([1, 2, 3, 4, 5])
+        assert buffer.drain() == [3, 4, 5]
+        assert buffer.dropped == 2
+
+    def test_requeue_goes_to_front(self):
+        """Test that rows from a failed flush are written before newer rows"""
+        buffer = SnapshotBuffer(10)
+        buffer.add([3])
+        buffer.requeue([1, 2])
+        assert buffer.drain() == [1, 2, 3]
+
+
+class TestKalshiRecorder:
+    def test_capture_buffers_one_row_per_market(self, recorder):
+        """Test that capture adds a row per market without touching the database"""
+        assert recorder.capture() == 2
+        assert len(recorder.buffer) == 2
+        recorder.mock_db.insert_kalshi_snapshots.assert_not_called()
+
+        row = recorder.buffer.drain()[0]
+        assert row[1] == 'KNYC'
+        assert row[3] == date(2025, 9, 7)
+        assert row[4] == 'KXHIGHNY-25SEP07-B80.5'
+        assert row[7:10] == (40, 44, 42)
+        assert row[12].obj == [[40, 10]]
+
+    def test_capture_ignores_markets_from_other_events(self, recorder):
+        """Test that only markets matching the event prefix are kept"""
+        recorder.request.side_effect = lambda path, params=None: (
+            {'markets': [market('KXHIGHNYC-X', event_ticker='KXHIGHNYC-25SEP07')]}
+            if not path.endswith('/orderbook') else {'orderbook': {}}
+        )
+        assert recorder.capture() == 0
+
+    def test_capture_continues_after_location_failure(self, recorder):
+        """Test that one failing location does not stop the others"""
+        fake_request = recorder.request.side_effect
+
+        def failing_request(path, params=None):
+            if params and params.get('series_ticker') == 'KXHIGHMIA':
+                raise requests.ConnectionError('down')
+            return fake_request(path, params)
+
+        recorder.request.side_effect = failing_request
+        assert recorder.capture() == 2
+
+    def test_flush_writes_batch_once(self, recorder):
+        """Test that several captures are written with a single insert"""
+        recorder.capture()
+        recorder.capture()
+        recorder.capture()
+
+        assert recorder.flush() == 6
+        recorder.mock_db.create_kalshi_snapshot_table.assert_called_once()
+        recorder.mock_db.insert_kalshi_snapshots.assert_called_once()
+        assert len(recorder.mock_db.insert_kalshi_snapshots.call_args[0][0]) == 6
+        assert len(recorder.buffer) == 0
+
+    def test_flush_failure_requeues_rows(self, recorder):
+        """Test that rows survive a failed write and the connection is reset"""
+        recorder.capture()
+        recorder.mock_db.insert_kalshi_snapshots.side_effect = Exception('connection lost')
+
+        assert recorder.flush() == 0
+        assert len(recorder.buffer) == 2
+        assert recorder.db is None
+
+    def test_should_flush_on_batch_size(self, recorder):
+        """Test that a full batch triggers a flush before the interval elapses"""
+        assert not recorder.should_flush()
+        recorder.buffer.add([()] * 1000)
+        assert recorder.should_flush()
+
+    def test_orderbooks_limited_and_rotated(self, recorder):
+        """Test that each tick fetches only a few orderbooks, oldest first, covering every market in turn"""
+        tickers = [f'KXHIGHNY-25SEP07-B{80 + i}.5' for i in range(5)]
+        fake_request = recorder.request.side_effect
+        recorder.request.side_effect = lambda path, params=None: (
+            {'markets': [market(ticker) for ticker in tickers]}
+            if not path.endswith('/orderbook') and params['series_ticker'] == 'KXHIGHNY'
+            else fake_request(path, params)
+        )
+
+        def booked_tickers():
+            rows = recorder.buffer.drain()
+            assert len(rows) == 5
+            return {row[4] for row in rows if row[12] is not None}
+
+        recorder.capture()
+        first = booked_tickers()
+        recorder.capture()
+        second = booked_tickers()
+
+        assert len(first) == 3
+        assert len(second) == 3
+        assert first | second == set(tickers)
+        orderbook_calls = [c for c in recorder.request.call_args_list if c[0][0].endswith('/orderbook')]
+        assert len(orderbook_calls) == 6
+
+    def test_orderbook_failure_keeps_market_row(self, recorder):
+        """Test that a failed orderbook request still records top-of-book prices"""
+        fake_request = recorder.request.side_effect
+
+        def failing_orderbook(path, params=None):
+            if path.endswith('/orderbook'):
+                raise requests.ConnectionError('down')
+            return fake_request(path, params)
+
+        recorder.request.side_effect = failing_orderbook
+        assert recorder.capture() == 2
+        assert all(row[12] is None for row in recorder.buffer.drain())
+
+    def test_failed_flush_backs_off(self, recorder):
+        """Test that a failed flush is not retried until flush_interval_seconds have passed"""
+        recorder.capture()
+        recorder.buffer.add([()] * 1000)
+        recorder.mock_db.insert_kalshi_snapshots.side_effect = Exception('connection lost')
+
+        recorder.flush()
+        assert not recorder.should_flush()
+
+        recorder.retry_flush_at = 0.0
+        assert recorder.should_flush()
+
+    def test_capture_continues_while_flush_blocks(self, recorder, monkeypatch):
+        """Test that a stalled database write does not delay capture"""
+        monkeypatch.setattr(kalshi_recorder, 'FLUSH_CHECK_INTERVAL', 0.01)
+        monkeypatch.setattr(recorder, 'should_flush', lambda: True)
+        release = threading.Event()
+        recorder.mock_db.insert_kalshi_snapshots.side_effect = lambda rows: release.wait(timeout=5) and len(rows)
+
+        captures = []
+        real_capture = recorder.capture
+
+        def counting_capture():
+            captures.append(1)
+            if len(captures) >= 3:
+                recorder.stop()
+            return real_capture()
+
+        recorder.capture = counting_capture
+        kalshi = kalshi_recorder.get_config().kalshi
+        config = SimpleNamespace(kalshi=replace(kalshi, recorder=replace(kalshi.recorder, interval_seconds=0.01)))
+        monkeypatch.setattr(kalshi_recorder, 'get_config', lambda: config)
+
+        runner = threading.Thread(target=recorder.run)
+        runner.start()
+        deadline = time.monotonic() + 5
+        while len(captures) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(captures) >= 3
+        release.set()
+        runner.join(timeout=5)
+        assert not runner.is_alive()
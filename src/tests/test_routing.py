@@ -0,0 +1,283 @@
+import os
+import time
+import pytest
+import threading
+import psycopg
+from contextlib import contextmanager
+from dataclasses import replace
+from src.weather_api.config.loader import DatabaseSettings, ReplicaSettings, ReplicaLagSettings, PoolSettings
+from psycopg_pool import PoolClosed, PoolTimeout
+from src.weather_api.database import routing
+from src.weather_api.database.routing import ConnectionRouter
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def execute(self, query):
+        if self.pool.down:
+            raise psycopg.OperationalError('connection refused')
+        if self.pool.error is not None:
+            raise self.pool.error
+        return self
+
+    def fetchone(self):
+        return (self.pool.lag,)
+
+
+class FakePool:
+    def __init__(self, kwargs, **options):
+        self.kwargs = kwargs
+        self.options = options
+        self.lag = 0.0
+        self.down = False
+        self.error = None
+        self.closed = False
+        # While set, connections are only handed out once it is cleared, as for a server that stopped answering
+        self.hung = threading.Event()
+        self.released = threading.Event()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        if self.closed:
+            raise PoolClosed('the pool is already closed')
+        if self.hung.is_set() and not self.released.wait(timeout):
+            raise PoolTimeout(f'couldn\'t get a connection after {timeout} sec')
+        if self.down:
+            raise psycopg.OperationalError('connection refused')
+        yield FakeConnection(self)
+
+    def close(self):
+        self.closed = True
+
+
+def make_settings(replica_count=2, **lag):
+    return DatabaseSettings(
+        host='primary', port=5432, dbname='weather_forecasts',
+        pool=PoolSettings(min_size=0, max_size=4),
+        replicas=tuple(ReplicaSettings(host=f'replica{i}', port=5432) for i in range(replica_count)),
+        replica_lag=ReplicaLagSettings(**lag) if lag else ReplicaLagSettings(),
+    )
+
+
+@pytest.fixture
+def router():
+    """Router without the lag monitor thread; tests measure lag with check_lag()"""
+    router = ConnectionRouter(make_settings(), pool_factory=FakePool, monitor_lag=False)
+    check_lag(router)
+    return router
+
+
+def check_lag(router):
+    for replica in router.replicas:
+        router.refresh_lag(replica)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not met in time'
+        time.sleep(0.01)
+
+
+def server_of(conn):
+    return conn.pool.kwargs['host']
+
+
+class TestConnectionRouter:
+    def test_pools_per_server(self, router):
+        """Test that the primary and each replica get their own autocommit pool"""
+        assert router.primary.pool.kwargs['host'] == 'primary'
+        assert [r.pool.kwargs['host'] for r in router.replicas] == ['replica0', 'replica1']
+        assert router.primary.pool.kwargs['autocommit'] is True
+        assert router.primary.pool.options['max_size'] == 4
+
+    def test_reads_go_to_replicas(self, router):
+        """Test that read-only queries are served by a replica"""
+        assert router.execute(server_of).startswith('replica')
+
+    def test_writes_and_fresh_reads_go_to_primary(self, router):
+        """Test that writes and fresh reads bypass the replicas"""
+        assert router.execute(server_of, read_only=False) == 'primary'
+        assert router.execute(server_of, fresh=True) == 'primary'
+
+    def test_least_outstanding_requests(self, router):
+        """Test that the replica with fewer in-flight requests is chosen"""
+        router.replicas[0].outstanding = 3
+        router.replicas[1].outstanding = 1
+        assert router.choose().name == 'replica1:5432'
+
+    def test_idle_replicas_share_load(self, router):
+        """Test that sequential reads alternate between idle replicas"""
+        servers = [router.execute(server_of) for _ in range(4)]
+        assert servers == ['replica0', 'replica1', 'replica0', 'replica1']
+
+    def test_lagging_replica_is_skipped(self, router):
+        """Test that a replica behind the lag threshold is not used"""
+        router.replicas[0].pool.lag = 120.0
+        check_lag(router)
+        assert [router.execute(server_of) for _ in range(3)] == ['replica1'] * 3
+
+    def test_all_replicas_lagging_falls_back_to_primary(self, router):
+        """Test that reads go to the primary when every replica is behind"""
+        for replica in router.replicas:
+            replica.pool.lag = 120.0
+        check_lag(router)
+        assert router.execute(server_of) == 'primary'
+
+    def test_unknown_lag_counts_as_lagging(self, router):
+        """Test that a replica not streaming from the primary (lag NULL) is skipped"""
+        router.replicas[0].pool.lag = None
+        check_lag(router)
+        assert router.replicas[0].lag_seconds == float('inf')
+        assert [router.execute(server_of) for _ in range(2)] == ['replica1'] * 2
+
+    def test_unmeasured_replica_is_not_used(self):
+        """Test that reads use the primary until a replica's lag has been measured"""
+        router = ConnectionRouter(make_settings(), pool_factory=FakePool, monitor_lag=False)
+        assert router.execute(server_of) == 'primary'
+
+    def test_monitor_rechecks_lag(self):
+        """Test that the monitor thread measures lag in the background every interval"""
+        router = ConnectionRouter(make_settings(replica_count=1, check_interval_seconds=0.01),
+                                  pool_factory=FakePool)
+        try:
+            wait_for(lambda: router.choose().name == 'replica0:5432')
+            router.replicas[0].pool.lag = 120.0
+            wait_for(lambda: router.choose().is_primary)
+        finally:
+            router.close()
+        assert router.replicas[0].pool.closed
+
+    def test_monitor_survives_unexpected_errors(self):
+        """Test that an error other than a connection failure skips the replica without stopping the monitor"""
+        router = ConnectionRouter(make_settings(replica_count=1, check_interval_seconds=0.01),
+                                  pool_factory=FakePool)
+        try:
+            router.replicas[0].pool.error = psycopg.ProgrammingError('permission denied')
+            wait_for(lambda: router.replicas[0].lag_seconds == float('inf'))
+            assert router.choose().is_primary
+
+            router.replicas[0].pool.error = None
+            wait_for(lambda: router.replicas[0].lag_seconds == 0.0)
+        finally:
+            router.close()
+
+    def test_hung_replica_does_not_block_reads(self):
+        """Test that reads never wait on a lag check and a check that times out skips the replica"""
+        router = ConnectionRouter(make_settings(check_interval_seconds=0.01, timeout_seconds=0.2),
+                                  pool_factory=FakePool)
+        try:
+            wait_for(lambda: all(replica.lag_seconds == 0.0 for replica in router.replicas))
+            router.replicas[0].pool.hung.set()
+
+            # Reads are served while the check of replica0 is stuck waiting for a connection
+            started = time.monotonic()
+            for _ in range(20):
+                router.choose()
+            assert time.monotonic() - started < 0.1
+
+            wait_for(lambda: router.replicas[0].lag_seconds == float('inf'))
+            assert router.choose().name == 'replica1:5432'
+        finally:
+            router.replicas[0].pool.released.set()
+            router.close()
+
+    def test_unreachable_replica_falls_back_to_primary(self, router):
+        """Test that a replica failing mid-read is retried on the primary and skipped afterwards"""
+        router.replicas[1].outstanding = 1
+        router.replicas[0].pool.down = True
+
+        assert router.execute(server_of) == 'primary'
+        assert router.replicas[0].lag_seconds == float('inf')
+        assert router.choose().name == 'replica1:5432'
+
+    def test_primary_failure_is_raised(self, router):
+        """Test that errors on the primary are not retried"""
+        router.primary.pool.down = True
+        with pytest.raises(psycopg.OperationalError):
+            router.execute(server_of, read_only=False)
+
+    def test_outstanding_released_after_error(self, router):
+        """Test that in-flight counts are decremented when a query fails"""
+        def fail(conn):
+            raise ValueError('bad query')
+
+        with pytest.raises(ValueError):
+            router.execute(fail)
+        assert all(endpoint.outstanding == 0 for endpoint in [router.primary] + router.replicas)
+
+    @pytest.mark.parametrize('read_only', [True, False])
+    def test_replaced_router_retries_on_current_router(self, router, monkeypatch, read_only):
+        """Test that a query reaching a router closed by a settings reload runs on its replacement"""
+        current = ConnectionRouter(make_settings(), pool_factory=FakePool, monitor_lag=False)
+        monkeypatch.setattr(routing, 'get_router', lambda: current)
+        router.close()
+
+        router.execute(server_of, read_only=read_only)
+        assert sum(endpoint.requests for endpoint in [current.primary] + current.replicas) == 1
+        assert all(replica.lag_seconds == 0.0 for replica in router.replicas)
+
+    def test_closed_current_router_raises(self, router, monkeypatch):
+        """Test that PoolClosed is raised when the closed router is still the current one"""
+        monkeypatch.setattr(routing, 'get_router', lambda: router)
+        router.close()
+        with pytest.raises(PoolClosed):
+            router.execute(server_of)
+
+    def test_pool_key_ignores_lag_settings(self):
+        """Test that only connection and pool settings require new pools"""
+        settings = make_settings()
+        assert ConnectionRouter.pool_key_for(settings) == ConnectionRouter.pool_key_for(
+            replace(settings, replica_lag=ReplicaLagSettings(max_seconds=5)))
+        assert ConnectionRouter.pool_key_for(settings) != ConnectionRouter.pool_key_for(
+            replace(settings, replicas=()))
+
+
+def parse_servers(value):
+    servers = []
+    for item in value.split(','):
+        host, _, port = item.strip().partition(':')
+        servers.append((host, int(port or 5432)))
+    return servers
+
+
+@pytest.mark.skipif(
+    not (os.environ.get('TEST_POSTGRES_PRIMARY') and os.environ.get('TEST_POSTGRES_REPLICAS')),
+    reason='Set TEST_POSTGRES_PRIMARY=host:port and TEST_POSTGRES_REPLICAS=host:port,... to run'
+)
+class TestConnectionRouterIntegration:
+    """Route real queries across local Postgres instances, identified by their port"""
+
+    @pytest.fixture
+    def live_router(self):
+        (host, port), = parse_servers(os.environ['TEST_POSTGRES_PRIMARY'])
+        replicas = parse_servers(os.environ['TEST_POSTGRES_REPLICAS'])
+        settings = DatabaseSettings(
+            host=host, port=port,
+            dbname=os.environ.get('POSTGRES_DB', 'postgres'),
+            user=os.environ.get('POSTGRES_USER'),
+            password=os.environ.get('POSTGRES_PASSWORD'),
+            pool=PoolSettings(min_size=1, max_size=2),
+            replicas=tuple(ReplicaSettings(host=h, port=p) for h, p in replicas),
+        )
+        router = ConnectionRouter(settings)
+        # Reads go to the primary until the monitor has measured every replica once
+        wait_for(lambda: all(replica.lag_seconds is not None for replica in router.replicas), timeout=10.0)
+        yield router
+        router.close()
+
+    @staticmethod
+    def server_port(conn):
+        return conn.execute('SELECT inet_server_port()').fetchone()[0]
+
+    def test_reads_spread_over_replicas(self, live_router):
+        replica_ports = {replica.port for replica in live_router.settings.replicas}
+        assert all(live_router.usable(replica) for replica in live_router.replicas), \
+            'every replica must be streaming and within max_seconds, and the user needs pg_read_all_stats'
+        ports = {live_router.execute(self.server_port) for _ in range(2 * len(replica_ports))}
+        assert ports == replica_ports
+
+    def test_fresh_read_uses_primary(self, live_router):
+        assert live_router.execute(self.server_port, fresh=True) == live_router.settings.port
@@ -0,0 +1,182 @@
+import os
+import pytest
+import psycopg
+from datetime import date
+from pathlib import Path
+from psycopg import sql
+from src.weather_api.database.snapshot_selection import SnapshotPolicy, forecast_snapshots
+
+SQL_FILES = Path(__file__).parent.parent / 'weather_api' / 'database' / 'sql_files'
+
+
+def render(policy, provider=None):
+    return forecast_snapshots(policy, provider).as_string(None)
+
+
+class TestSnapshotPolicy:
+    def test_default_matches_previous_behaviour(self):
+        """Test that the default policy is the earliest forecast issued after 02:00"""
+        policy = SnapshotPolicy()
+        assert policy.kind == 'earliest_after'
+        assert policy.hour == 2
+
+    def test_from_args(self):
+        """Test that query parameters are converted to a policy"""
+        assert SnapshotPolicy.from_args({}) == SnapshotPolicy()
+        assert SnapshotPolicy.from_args({'policy': 'latest_before', 'hour': '10'}) == \
+            SnapshotPolicy(kind='latest_before', hour=10)
+        assert SnapshotPolicy.from_args({'policy': 'lead_time', 'lead_hours': '48'}) == \
+            SnapshotPolicy(kind='lead_time', lead_hours=48)
+
+    @pytest.mark.parametrize('args', [
+        {'policy': 'median'},
+        {'hour': '24'},
+        {'hour': 'noon'},
+        {'policy': 'lead_time', 'lead_hours': '-1'},
+    ])
+    def test_invalid_args(self, args):
+        """Test that invalid parameters raise ValueError"""
+        with pytest.raises(ValueError):
+            SnapshotPolicy.from_args(args)
+
+    def test_policies_are_hashable(self):
+        """Test that policies can be part of coalescing and cache keys"""
+        assert len({SnapshotPolicy(), SnapshotPolicy(), SnapshotPolicy(kind='lead_time')}) == 2
+
+
+class TestForecastSnapshots:
+    def test_single_scan_without_self_join(self):
+        """Test that weather_forecasts is read once with no join back onto itself"""
+        query = render(SnapshotPolicy(), 'test_provider')
+        assert query.count('weather_forecasts') == 1
+        assert 'JOIN' not in query.upper()
+        assert 'RANK() OVER' in query
+
+    def test_provider_filter_pushed_into_scan(self):
+        """Test that the provider filter is part of the scan only when a provider is given"""
+        assert 'provider = %(provider)s' in render(SnapshotPolicy(), 'test_provider')
+        assert '%(provider)s' not in render(SnapshotPolicy())
+
+    @pytest.mark.parametrize('policy, expected_filter, expected_order', [
+        (SnapshotPolicy(), 'EXTRACT(HOUR FROM timestamp) > %(hour)s', 'ORDER BY timestamp ASC'),
+        (SnapshotPolicy(kind='latest_before', hour=12), 'EXTRACT(HOUR FROM timestamp) < %(hour)s',
+         'ORDER BY timestamp DESC'),
+        (SnapshotPolicy(kind='lead_time'), 'make_interval(hours => %(lead_hours)s)', 'ORDER BY timestamp DESC'),
+    ])
+    def test_policy_sql(self, policy, expected_filter, expected_order):
+        """Test that each policy selects with its own filter and ordering"""
+        query = render(policy)
+        assert expected_filter in query
+        assert expected_order in query
+
+    @pytest.mark.parametrize('query_file', ['get_forecasted_highs.sql', 'get_consensus_forecast.sql'])
+    def test_queries_embed_snapshots(self, query_file):
+        """Test that the forecast queries are built on the selection engine"""
+        template = (SQL_FILES / query_file).read_text()
+        query = sql.SQL(template).format(forecast_snapshots=forecast_snapshots(SnapshotPolicy())).as_string(None)
+        assert query.count('weather_forecasts') == 1
+        assert 'RANK() OVER' in query
+
+
+# get_forecasted_highs.sql before the selection engine, to check the default policy against
+PREVIOUS_HIGHS_QUERY = """
+WITH earliest_forecast_per_day AS (
+    SELECT MIN(timestamp) as earliest_timestamp, location, provider
+        FROM weather_forecasts
+        WHERE location = %s
+            AND timestamp > %s
+            AND EXTRACT(HOUR FROM timestamp) > 2
+        GROUP BY DATE(timestamp), provider, location),
+daily_forecast AS (
+    SELECT wf.*
+    FROM weather_forecasts wf
+    INNER JOIN earliest_forecast_per_day ef
+        ON wf.timestamp = ef.earliest_timestamp
+        AND wf.location = ef.location
+        AND wf.provider = ef.provider
+    WHERE DATE(wf.end_time) = DATE(ef.earliest_timestamp)
+)
+SELECT DATE(timestamp) as date, MAX(temperature) as forecasted_high
+FROM daily_forecast
+WHERE provider = %s
+GROUP BY DATE(timestamp), location, provider
+ORDER BY date
+"""
+
+# issued at -> [(period end, temperature)], all for KNYC
+ISSUANCES = {
+    # Issued two days ahead; only lead_time can pick them for the 8th
+    '2025-09-06 10:00': [('2025-09-08 12:00', 86.0)],
+    '2025-09-06 20:00': [('2025-09-08 12:00', 88.0)],
+    '2025-09-07 01:00': [('2025-09-07 12:00', 70.0), ('2025-09-07 18:00', 71.0)],
+    '2025-09-07 03:00': [('2025-09-07 12:00', 80.0), ('2025-09-07 18:00', 82.0), ('2025-09-08 12:00', 90.0)],
+    '2025-09-07 09:00': [('2025-09-07 15:00', 84.0), ('2025-09-07 20:00', 83.0)],
+    '2025-09-07 23:00': [('2025-09-07 23:30', 78.0)],
+}
+
+
+@pytest.mark.skipif(
+    not os.environ.get('TEST_POSTGRES_PRIMARY'),
+    reason='Set TEST_POSTGRES_PRIMARY=host:port to run'
+)
+class TestForecastSnapshotsIntegration:
+    """Run the selection query against a temporary weather_forecasts table on a local Postgres"""
+
+    @pytest.fixture
+    def conn(self):
+        host, _, port = os.environ['TEST_POSTGRES_PRIMARY'].partition(':')
+        with psycopg.connect(host=host, port=int(port or 5432),
+                             dbname=os.environ.get('POSTGRES_DB', 'postgres'),
+                             user=os.environ.get('POSTGRES_USER'),
+                             password=os.environ.get('POSTGRES_PASSWORD')) as conn:
+            # The temporary table shadows the real one for this session only
+            conn.execute('CREATE TEMP TABLE weather_forecasts '
+                         '(location TEXT, provider TEXT, timestamp TIMESTAMP, end_time TIMESTAMP, temperature REAL)')
+            for provider, offset in (('test_provider', 0.0), ('other_provider', -10.0)):
+                for issued_at, periods in ISSUANCES.items():
+                    for end_time, temperature in periods:
+                        self.add_forecast(conn, issued_at, end_time, temperature + offset, provider)
+            yield conn
+
+    @staticmethod
+    def add_forecast(conn, issued_at, end_time, temperature, provider='test_provider'):
+        conn.execute('INSERT INTO weather_forecasts VALUES (%s, %s, %s, %s, %s)',
+                     ('KNYC', provider, issued_at, end_time, temperature))
+
+    @staticmethod
+    def highs(conn, policy):
+        query = sql.SQL((SQL_FILES / 'get_forecasted_highs.sql').read_text()).format(
+            forecast_snapshots=forecast_snapshots(policy, 'test_provider'))
+        params = dict(policy.params(), locations=['KNYC'], provider='test_provider', cutoff='2025-09-06')
+        return [tuple(row) for row in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def previous_highs(conn):
+        return [tuple(row) for row in conn.execute(PREVIOUS_HIGHS_QUERY,
+                                                   ('KNYC', '2025-09-06', 'test_provider')).fetchall()]
+
+    def test_default_matches_previous_query(self, conn):
+        """Test that the default policy returns the same highs as the old MIN and self-join query"""
+        assert self.previous_highs(conn) == [(date(2025, 9, 7), 82.0)]
+        assert self.highs(conn, SnapshotPolicy()) == self.previous_highs(conn)
+
+    def test_latest_before(self, conn):
+        """Test that latest_before picks the last same-day issuance before the hour"""
+        assert self.highs(conn, SnapshotPolicy(kind='latest_before', hour=10)) == [(date(2025, 9, 7), 84.0)]
+        assert self.highs(conn, SnapshotPolicy(kind='latest_before', hour=2)) == [(date(2025, 9, 7), 71.0)]
+
+    def test_lead_time(self, conn):
+        """Test that lead_time picks the last issuance at least lead_hours before the day starts"""
+        assert self.highs(conn, SnapshotPolicy(kind='lead_time', lead_hours=24)) == [(date(2025, 9, 8), 88.0)]
+        assert self.highs(conn, SnapshotPolicy(kind='lead_time', lead_hours=30)) == [(date(2025, 9, 8), 86.0)]
+
+    def test_issuance_without_same_day_period(self, conn):
+        """
+        Test the one intended change from the old query: when the earliest
+        qualifying issuance has no period ending that day, the next one that
+        does is used instead of dropping the day.
+        """
+        self.add_forecast(conn, '2025-09-06 20:00', '2025-09-06 23:00', 77.0)
+
+        assert date(2025, 9, 6) not in dict(self.previous_highs(conn))
+        assert dict(self.highs(conn, SnapshotPolicy()))[date(2025, 9, 6)] == 77.0
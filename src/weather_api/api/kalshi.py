@@ -1,9 +1,13 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 import datetime
+from src.weather_api.database.database import Database
 from src.weather_api.external.kalshi_client import get_kalshi_credentials, get
 
 kalshi_bp = Blueprint('kalshi', __name__, url_prefix='/kalshi')
 
+# Longest /kalshi/history interval: one day
+MAX_INTERVAL_MINUTES = 24 * 60
+
 
 @kalshi_bp.route('/balance')
 def get_balance():
@@ -46,3 +50,72 @@ def get_balance():
             'status': 'error',
             'error': f'Unexpected error: {str(e)}'
         }), 500
+
+
+@kalshi_bp.route('/history')
+def price_history():
+    """
+    Get recorded Kalshi market prices per event date.
+
+    Dates are the day the event's high is measured on, matching the dates
+    returned by /forecast/highs.
+
+    Query Parameters:
+        location (required): Location code (e.g., 'KNYC')
+        cutoff (optional): Only events dated on or after this date (default: '2025-09-06')
+        ticker (optional): Restrict to a single market ticker
+        interval_minutes (optional): Keep only the last snapshot per market in each interval (1 to 1440)
+
+    Returns:
+        JSON response with price history grouped by date and market
+    """
+    location = request.args.get('location')
+    cutoff = request.args.get('cutoff', '2025-09-06')
+    ticker = request.args.get('ticker')
+    interval_minutes = request.args.get('interval_minutes')
+
+    if not location:
+        return jsonify({'error': 'Missing required parameter: location'}), 400
+
+    bucket_seconds = None
+    if interval_minutes is not None:
+        if not interval_minutes.isdigit() or not 1 <= int(interval_minutes) <= MAX_INTERVAL_MINUTES:
+            return jsonify({'error': f'interval_minutes must be an integer from 1 to {MAX_INTERVAL_MINUTES}'}), 400
+        bucket_seconds = int(interval_minutes) * 60
+
+    try:
+        db = Database()
+        results = db.get_kalshi_price_history(location, cutoff, ticker, bucket_seconds)
+
+        # Rows arrive ordered by date, ticker and time; group consecutive rows per market
+        history = []
+        for result in results:
+            date = result['date'].isoformat()
+            if not history or history[-1]['date'] != date or history[-1]['ticker'] != result['ticker']:
+                history.append({
+                    'date': date,
+                    'ticker': result['ticker'],
+                    'floor_strike': result['floor_strike'],
+                    'cap_strike': result['cap_strike'],
+                    'snapshots': []
+                })
+            history[-1]['snapshots'].append({
+                'captured_at': result['captured_at'].isoformat(),
+                'yes_bid': result['yes_bid'],
+                'yes_ask': result['yes_ask'],
+                'last_price': result['last_price'],
+                'volume': result['volume'],
+                'open_interest': result['open_interest']
+            })
+
+        return jsonify({
+            'location': location,
+            'cutoff': cutoff,
+            'ticker': ticker,
+            'interval_minutes': int(interval_minutes) if interval_minutes else None,
+            'history': history
+        })
+    except AttributeError as e:
+        return jsonify({'error': f'Query file not found: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
@@ -1,10 +1,21 @@
 from flask import Blueprint, jsonify, request, current_app
 import datetime
 from src.weather_api.database.database import Database
+from src.weather_api.database.cache import query_cache
+from src.weather_api.database.coalescing import single_flight
+from src.weather_api.database.routing import get_router_stats
+from src.weather_api.database.snapshot_selection import SnapshotPolicy
 
 weather_bp = Blueprint('weather', __name__)
 
 
+def policy_json(policy):
+    """Describe a SnapshotPolicy with only the parameters it uses."""
+    if policy.kind == 'lead_time':
+        return {'policy': policy.kind, 'lead_hours': policy.lead_hours}
+    return {'policy': policy.kind, 'hour': policy.hour}
+
+
 @weather_bp.route('/')
 def hello_world():
     return jsonify({
@@ -23,6 +34,23 @@ def health_check():
     })
 
 
+@weather_bp.route('/stats')
+def stats():
+    """
+    Get query execution counters for this worker.
+
+    Returns:
+        JSON response with executed/coalesced and cache hit/miss counts per query,
+        and request counts and replica lag per database server
+    """
+    return jsonify({
+        'coalescing': single_flight.stats(),
+        'cache': query_cache.stats(),
+        'routing': get_router_stats(),
+        'timestamp': datetime.datetime.now().isoformat()
+    })
+
+
 @weather_bp.route('/endpoints')
 def list_endpoints():
     """List all available API endpoints."""
@@ -45,6 +73,9 @@ def forecast_highs():
         location (required): Location code (e.g., 'KNYC')
         provider (required): Weather data provider
         cutoff (optional): Cutoff date (default: '2025-09-06')
+        policy (optional): earliest_after, latest_before or lead_time (default: 'earliest_after')
+        hour (optional): Hour for earliest_after/latest_before (default: 2)
+        lead_hours (optional): Hours before the day starts for lead_time (default: 24)
 
     Returns:
         JSON response with forecasted highs per day
@@ -59,9 +90,14 @@ def forecast_highs():
     if not provider:
         return jsonify({'error': 'Missing required parameter: provider'}), 400
 
+    try:
+        policy = SnapshotPolicy.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = Database()
-        results = db.get_forecasted_highs(location, provider, cutoff)
+        results = db.get_forecasted_highs(location, provider, cutoff, policy=policy)
 
         # Convert date objects to strings for JSON serialization
         for result in results:
@@ -72,6 +108,7 @@ def forecast_highs():
             'location': location,
             'provider': provider,
             'cutoff': cutoff,
+            'policy': policy_json(policy),
             'forecasted_highs': results
         })
     except AttributeError as e:
@@ -80,6 +117,57 @@ def forecast_highs():
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
 
+@weather_bp.route('/forecast/consensus')
+def forecast_consensus():
+    """
+    Get per-day forecast statistics across all providers.
+
+    Query Parameters:
+        locations (required): Comma-separated location codes (e.g., 'KNYC,KMIA')
+        cutoff (optional): Cutoff date (default: '2025-09-06')
+        weighted (optional): 'true' to include a mean weighted by each provider's past accuracy
+        policy, hour, lead_hours (optional): Forecast selection policy, as for /forecast/highs
+
+    Returns:
+        JSON response with consensus statistics per location and day
+    """
+    locations = sorted({loc.strip() for loc in request.args.get('locations', '').split(',') if loc.strip()})
+    cutoff = request.args.get('cutoff', '2025-09-06')
+    weighted = request.args.get('weighted', 'false').lower() in ('true', '1', 'yes')
+
+    if not locations:
+        return jsonify({'error': 'Missing required parameter: locations'}), 400
+
+    try:
+        policy = SnapshotPolicy.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        db = Database()
+        results = db.get_consensus_forecast(locations, cutoff, weighted, policy=policy)
+
+        consensus = {location: [] for location in locations}
+        for result in results:
+            location = result.pop('location')
+            result['date'] = result['date'].isoformat()
+            if not weighted:
+                result.pop('weighted_mean', None)
+            consensus[location].append(result)
+
+        return jsonify({
+            'locations': locations,
+            'cutoff': cutoff,
+            'weighted': weighted,
+            'policy': policy_json(policy),
+            'consensus': consensus
+        })
+    except AttributeError as e:
+        return jsonify({'error': f'Query file not found: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+
 @weather_bp.route('/observations/highs')
 def observed_highs():
     """
@@ -1,9 +1,13 @@
 from flask import Flask
 from .api.weather import weather_bp
 from .api.kalshi import kalshi_bp
+from .config.loader import get_config
 
 
 def create_app():
+    # Load and validate configuration at startup rather than on the first request
+    get_config()
+
     app = Flask(__name__)
 
     app.register_blueprint(weather_bp)
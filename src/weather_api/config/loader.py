@@ -1,15 +1,381 @@
 import os
+import time
+import logging
+import threading
 import yaml
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent
+
+# Minimum number of seconds between mtime checks in get_config()
+RELOAD_CHECK_INTERVAL = 1.0
+
+# (section, key) -> environment variable; environment values win over the YAML files
+ENV_OVERRIDES = {
+    ('database', 'host'): 'POSTGRES_HOST',
+    ('database', 'port'): 'POSTGRES_PORT',
+    ('database', 'dbname'): 'POSTGRES_DB',
+    ('database', 'user'): 'POSTGRES_USER',
+    ('database', 'password'): 'POSTGRES_PASSWORD',
+    ('database', 'replicas'): 'POSTGRES_REPLICAS',
+    ('kalshi', 'base_url'): 'KALSHI_BASE_URL',
+}
+
+
+class ConfigError(ValueError):
+    """Raised when a configuration file is missing or invalid."""
+
+
+def _require(section: Mapping[str, Any], key: str, name: str) -> Any:
+    value = section.get(key)
+    if value is None or value == '':
+        raise ConfigError(f'Missing required {name} setting: {key}')
+    return value
+
+
+def _as_int(value: Any, key: str, minimum: int = 0) -> int:
+    try:
+        result = int(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f'Setting {key} must be an integer, got {value!r}')
+    if result < minimum:
+        raise ConfigError(f'Setting {key} must be >= {minimum}, got {result}')
+    return result
+
+
+def _as_float(value: Any, key: str) -> float:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f'Setting {key} must be a number, got {value!r}')
+    if result <= 0:
+        raise ConfigError(f'Setting {key} must be positive, got {result}')
+    return result
+
+
+@dataclass(frozen=True)
+class CoalescingSettings:
+    enabled: bool = True
+    queries: Dict[str, bool] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, section: Optional[Mapping[str, Any]]) -> 'CoalescingSettings':
+        section = section or {}
+        queries = section.get('queries') or {}
+        if not isinstance(queries, dict):
+            raise ConfigError('Setting database.coalescing.queries must be a mapping')
+        return cls(
+            enabled=bool(section.get('enabled', True)),
+            queries={name: bool(enabled) for name, enabled in queries.items()},
+        )
+
+    def is_enabled(self, query_name: str) -> bool:
+        """Queries not listed under coalescing.queries are not coalesced."""
+        return self.enabled and self.queries.get(query_name, False)
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    max_entries: int = 1024
+    ttl_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, section: Optional[Mapping[str, Any]]) -> 'CacheSettings':
+        section = section or {}
+        ttl_seconds = section.get('ttl_seconds') or {}
+        if not isinstance(ttl_seconds, dict):
+            raise ConfigError('Setting database.cache.ttl_seconds must be a mapping')
+        for name, ttl in ttl_seconds.items():
+            try:
+                if float(ttl) < 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                raise ConfigError(f'Setting database.cache.ttl_seconds.{name} must be a non-negative number')
+        return cls(
+            max_entries=_as_int(section.get('max_entries', 1024), 'database.cache.max_entries', minimum=1),
+            ttl_seconds={name: float(ttl) for name, ttl in ttl_seconds.items()},
+        )
+
+    def ttl(self, query_name: str) -> float:
+        """Cache lifetime for a query; 0 means the query is not cached."""
+        return self.ttl_seconds.get(query_name, 0.0)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    min_size: int = 1
+    max_size: int = 10
+    timeout_seconds: float = 10.0
+
+    @classmethod
+    def from_dict(cls, section: Optional[Mapping[str, Any]]) -> 'PoolSettings':
+        section = section or {}
+        settings = cls(
+            min_size=_as_int(section.get('min_size', 1), 'database.pool.min_size'),
+            max_size=_as_int(section.get('max_size', 10), 'database.pool.max_size', minimum=1),
+            timeout_seconds=_as_float(section.get('timeout_seconds', 10.0), 'database.pool.timeout_seconds'),
+        )
+        if settings.max_size < settings.min_size:
+            raise ConfigError('Setting database.pool.max_size must be >= min_size')
+        return settings
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    host: str
+    port: int
+
+    @classmethod
+    def parse_list(cls, value: Any) -> Tuple['ReplicaSettings', ...]:
+        """
+        Parse database.replicas, either a list of host/port mappings from YAML
+        or a "host:port,host:port" string from POSTGRES_REPLICAS.
+        """
+        if not value:
+            return ()
+        if isinstance(value, str):
+            entries = []
+            for item in value.split(','):
+                host, _, port = item.strip().partition(':')
+                entries.append({'host': host, 'port': port or 5432})
+            value = entries
+        if not isinstance(value, list):
+            raise ConfigError('Setting database.replicas must be a list')
+
+        replicas = []
+        for entry in value:
+            if not isinstance(entry, dict):
+                raise ConfigError('Each database.replicas entry must have a host and port')
+            replicas.append(cls(
+                host=str(_require(entry, 'host', 'database.replicas')),
+                port=_as_int(entry.get('port', 5432), 'database.replicas.port', minimum=1),
+            ))
+        return tuple(replicas)
+
+
+@dataclass(frozen=True)
+class ReplicaLagSettings:
+    max_seconds: float = 30.0
+    check_interval_seconds: float = 5.0
+    timeout_seconds: float = 2.0
+
+    @classmethod
+    def from_dict(cls, section: Optional[Mapping[str, Any]]) -> 'ReplicaLagSettings':
+        section = section or {}
+        return cls(
+            max_seconds=_as_float(section.get('max_seconds', 30.0), 'database.replica_lag.max_seconds'),
+            check_interval_seconds=_as_float(section.get('check_interval_seconds', 5.0),
+                                             'database.replica_lag.check_interval_seconds'),
+            timeout_seconds=_as_float(section.get('timeout_seconds', 2.0), 'database.replica_lag.timeout_seconds'),
+        )
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    host: str
+    port: int
+    dbname: str
+    user: Optional[str] = None
+    password: Optional[str] = None
+    connect_timeout: int = 10
+    coalescing: CoalescingSettings = field(default_factory=CoalescingSettings)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    pool: PoolSettings = field(default_factory=PoolSettings)
+    replicas: Tuple[ReplicaSettings, ...] = ()
+    replica_lag: ReplicaLagSettings = field(default_factory=ReplicaLagSettings)
+
+    @classmethod
+    def from_dict(cls, section: Mapping[str, Any]) -> 'DatabaseSettings':
+        return cls(
+            host=str(_require(section, 'host', 'database')),
+            port=_as_int(_require(section, 'port', 'database'), 'database.port', minimum=1),
+            dbname=str(_require(section, 'dbname', 'database')),
+            user=section.get('user'),
+            password=section.get('password'),
+            connect_timeout=_as_int(section.get('connect_timeout', 10), 'database.connect_timeout', minimum=1),
+            coalescing=CoalescingSettings.from_dict(section.get('coalescing')),
+            cache=CacheSettings.from_dict(section.get('cache')),
+            pool=PoolSettings.from_dict(section.get('pool')),
+            replicas=ReplicaSettings.parse_list(section.get('replicas')),
+            replica_lag=ReplicaLagSettings.from_dict(section.get('replica_lag')),
+        )
+
+    def connection_kwargs(self, replica: Optional[ReplicaSettings] = None) -> Dict[str, Any]:
+        """Keyword arguments for psycopg.connect(), for the primary or the given replica."""
+        kwargs = {
+            'host': replica.host if replica else self.host,
+            'port': replica.port if replica else self.port,
+            'dbname': self.dbname,
+            'connect_timeout': self.connect_timeout,
+        }
+        if self.user is not None:
+            kwargs['user'] = self.user
+        if self.password is not None:
+            kwargs['password'] = self.password
+        return kwargs
+
+
+@dataclass(frozen=True)
+class RecorderSettings:
+    interval_seconds: float = 15.0
+    flush_interval_seconds: float = 60.0
+    flush_batch_size: int = 1000
+    max_buffer_size: int = 100000
+    capture_orderbook: bool = True
+    orderbook_depth: int = 5
+    orderbook_requests_per_tick: int = 3
+    max_requests_per_second: float = 10.0
+
+    @classmethod
+    def from_dict(cls, section: Optional[Mapping[str, Any]]) -> 'RecorderSettings':
+        section = section or {}
+        settings = cls(
+            interval_seconds=_as_float(section.get('interval_seconds', 15.0), 'kalshi.recorder.interval_seconds'),
+            flush_interval_seconds=_as_float(section.get('flush_interval_seconds', 60.0),
+                                             'kalshi.recorder.flush_interval_seconds'),
+            flush_batch_size=_as_int(section.get('flush_batch_size', 1000), 'kalshi.recorder.flush_batch_size', minimum=1),
+            max_buffer_size=_as_int(section.get('max_buffer_size', 100000), 'kalshi.recorder.max_buffer_size', minimum=1),
+            capture_orderbook=bool(section.get('capture_orderbook', True)),
+            orderbook_depth=_as_int(section.get('orderbook_depth', 5), 'kalshi.recorder.orderbook_depth', minimum=1),
+            orderbook_requests_per_tick=_as_int(section.get('orderbook_requests_per_tick', 3),
+                                                'kalshi.recorder.orderbook_requests_per_tick', minimum=1),
+            max_requests_per_second=_as_float(section.get('max_requests_per_second', 10.0),
+                                              'kalshi.recorder.max_requests_per_second'),
+        )
+        if settings.max_buffer_size < settings.flush_batch_size:
+            raise ConfigError('Setting kalshi.recorder.max_buffer_size must be >= flush_batch_size')
+        return settings
+
+
+@dataclass(frozen=True)
+class KalshiSettings:
+    base_url: str
+    locations: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    request_timeout: float = 10.0
+    recorder: RecorderSettings = field(default_factory=RecorderSettings)
+
+    @classmethod
+    def from_dict(cls, section: Mapping[str, Any]) -> 'KalshiSettings':
+        locations = section.get('locations') or {}
+        if not isinstance(locations, dict):
+            raise ConfigError('Setting kalshi.locations must be a mapping')
+        for location, values in locations.items():
+            if not isinstance(values, dict) or not values.get('event-prefix'):
+                raise ConfigError(f'Kalshi location {location} is missing event-prefix')
+
+        return cls(
+            base_url=str(_require(section, 'base_url', 'kalshi')).rstrip('/'),
+            locations=locations,
+            request_timeout=_as_float(section.get('request_timeout', 10.0), 'kalshi.request_timeout'),
+            recorder=RecorderSettings.from_dict(section.get('recorder')),
+        )
+
 
 class Config:
-    def __init__(self):
-        self.config_dir = Path(__file__).parent
-        self.database_config = self.load_yaml(self.config_dir / 'database.yaml')['database']
-        self.kalshi_config = self.load_yaml(self.config_dir / 'kalshi.yaml')['kalshi']
+    def __init__(self, config_dir: Optional[Path] = None, environ: Optional[Mapping[str, str]] = None):
+        self.config_dir = Path(config_dir) if config_dir is not None else CONFIG_DIR
+        environ = os.environ if environ is None else environ
+
+        self.files = {
+            'database': self.config_dir / 'database.yaml',
+            'kalshi': self.config_dir / 'kalshi.yaml',
+        }
+        # Recorded before reading so a write during loading still triggers a reload
+        self.mtimes = self.current_mtimes()
+
+        self.database_config = self.load_section('database', environ)
+        self.kalshi_config = self.load_section('kalshi', environ)
+
+        self.database = DatabaseSettings.from_dict(self.database_config)
+        self.kalshi = KalshiSettings.from_dict(self.kalshi_config)
 
     def load_yaml(self, file_path: str) -> Dict[str, Any]:
         with open(file_path, 'r') as f:
             content = f.read()
             return yaml.safe_load(content)
+
+    def load_section(self, name: str, environ: Mapping[str, str]) -> Dict[str, Any]:
+        """Load one top-level section from its YAML file and apply environment overrides."""
+        file_path = self.files[name]
+        try:
+            data = self.load_yaml(file_path)
+        except (OSError, yaml.YAMLError) as e:
+            raise ConfigError(f'Could not load {file_path}: {e}')
+
+        if not isinstance(data, dict) or not isinstance(data.get(name), dict):
+            raise ConfigError(f'{file_path} must contain a "{name}" mapping')
+
+        section = dict(data[name])
+        for (section_name, key), env_var in ENV_OVERRIDES.items():
+            if section_name == name and environ.get(env_var) is not None:
+                section[key] = environ[env_var]
+        return section
+
+    def current_mtimes(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for name, file_path in self.files.items():
+            try:
+                mtimes[name] = os.stat(file_path).st_mtime_ns
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+    def is_stale(self) -> bool:
+        """Return True if any of the config files changed since this Config was loaded."""
+        return self.current_mtimes() != self.mtimes
+
+
+_config: Optional[Config] = None
+_config_lock = threading.Lock()
+_last_check = 0.0
+_rejected_mtimes: Optional[Dict[str, Optional[int]]] = None
+
+
+def get_config() -> Config:
+    """
+    Get the process-wide configuration.
+
+    The YAML files are parsed once and re-parsed only when one of their mtimes
+    changes (checked at most every RELOAD_CHECK_INTERVAL seconds). An invalid
+    edit is logged and the previous configuration stays in effect; an invalid
+    configuration on first load raises ConfigError.
+
+    Returns:
+        The current Config instance
+    """
+    global _config, _last_check, _rejected_mtimes
+
+    config = _config
+    now = time.monotonic()
+    if config is not None and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return config
+
+    with _config_lock:
+        if _config is None:
+            _config = Config()
+        elif _config.is_stale():
+            mtimes = _config.current_mtimes()
+            if mtimes != _rejected_mtimes:
+                try:
+                    _config = Config()
+                    _rejected_mtimes = None
+                    logger.info("Reloaded configuration from %s", _config.config_dir)
+                except ConfigError as e:
+                    _rejected_mtimes = mtimes
+                    logger.error("Keeping previous configuration, reload failed: %s", e)
+        _last_check = now
+        return _config
+
+
+def reset_config():
+    """Drop the cached configuration so the next get_config() reloads it."""
+    global _config, _last_check, _rejected_mtimes
+
+    with _config_lock:
+        _config = None
+        _last_check = 0.0
+        _rejected_mtimes = None
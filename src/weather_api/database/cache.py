@@ -0,0 +1,99 @@
+import copy
+import time
+import inspect
+import functools
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from src.weather_api.config.loader import get_config
+from src.weather_api.database.coalescing import call_key, is_fresh
+
+
+class TTLCache:
+    """
+    Thread-safe cache of query results with a per-entry lifetime.
+
+    Entries are evicted least-recently-used once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def get(self, name: str, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached value.
+
+        Returns:
+            (True, copy of value) on a hit, (False, None) on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats[name]['hits'] += 1
+                value = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self._stats[name]['misses'] += 1
+                return False, None
+        return True, copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counts per query name."""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+query_cache = TTLCache()
+
+
+def cached(method: Callable) -> Callable:
+    """
+    Cache the results of a Database query method for its configured TTL.
+
+    The lifetime is set per query name through database.cache.ttl_seconds in
+    database.yaml; queries without a TTL, and calls with fresh=True, are
+    called directly without reading or storing a cached result. Place above
+    @coalesced so concurrent misses still share one execution.
+    """
+    signature = inspect.signature(method)
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        settings = get_config().database.cache
+        ttl = settings.ttl(name)
+        if not ttl:
+            return method(self, *args, **kwargs)
+
+        if is_fresh(signature, (self,) + args, kwargs):
+            return method(self, *args, **kwargs)
+
+        query_cache.max_entries = settings.max_entries
+        key = call_key(name, signature, (self,) + args, kwargs)
+        hit, value = query_cache.get(name, key)
+        if hit:
+            return value
+
+        value = method(self, *args, **kwargs)
+        query_cache.set(key, value, ttl)
+        return value
+
+    return wrapper
@@ -0,0 +1,171 @@
+import copy
+import inspect
+import functools
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable
+
+from src.weather_api.config.loader import get_config
+
+
+class CoalescedCallError(RuntimeError):
+    """Raised to waiters when the shared execution ended without a result."""
+
+
+_NO_RESULT = object()
+
+
+class _Call:
+    """A single in-flight execution that other callers can wait on."""
+
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = _NO_RESULT
+        self.error = None
+        self.waiters = 0
+
+
+def _waiter_error(error: BaseException) -> BaseException:
+    """
+    Build the exception a waiter raises for the leader's error.
+
+    Each waiter gets its own instance, chained to the original, so threads
+    never share one __traceback__. Errors that are not Exceptions (e.g.
+    SystemExit in the leader's thread) become CoalescedCallError.
+    """
+    if isinstance(error, Exception):
+        try:
+            duplicate = copy.copy(error)
+            if type(duplicate) is type(error):
+                return duplicate
+        except Exception:
+            pass
+    return CoalescedCallError(f'Coalesced call failed: {error!r}')
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and receive a copy of its result (or a copy
+    of its exception). The leader only pays for a copy when someone waited.
+    Nothing is cached once the execution finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = defaultdict(lambda: {'executed': 0, 'coalesced': 0})
+
+    def do(self, name: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for an identical in-flight call to finish.
+
+        Args:
+            name: Query name the call is counted under
+            key: Hashable key identifying identical calls
+            fn: Zero-argument callable performing the work
+
+        Returns:
+            fn's result, deep-copied whenever the call was shared so
+            callers can mutate it freely
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats[name]['executed'] += 1
+            else:
+                call.waiters += 1
+                self._stats[name]['coalesced'] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+            # The key is gone, so no one else can join: without waiters the result is the leader's alone
+            return copy.deepcopy(call.result) if call.waiters else call.result
+
+        call.event.wait()
+        if call.error is not None:
+            raise _waiter_error(call.error) from call.error
+        if call.result is _NO_RESULT:
+            raise CoalescedCallError('Coalesced call finished without a result')
+        return copy.deepcopy(call.result)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Executed and coalesced call counts per query name."""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+single_flight = SingleFlight()
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def call_key(name: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> Hashable:
+    """
+    Build a hashable key for a Database method call.
+
+    Arguments are bound against the method signature with defaults applied,
+    so positional, keyword and omitted-default spellings of the same call
+    produce the same key.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (name,) + tuple(
+        (arg, _normalize(value)) for arg, value in bound.arguments.items() if arg != 'self'
+    )
+
+
+def is_fresh(signature: inspect.Signature, args: tuple, kwargs: dict) -> bool:
+    """Whether a Database method call was made with fresh=True."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return bool(bound.arguments.get('fresh'))
+
+
+def coalesced(method: Callable) -> Callable:
+    """
+    Coalesce concurrent calls of a Database query method.
+
+    Calls with the same call_key() share one execution. Coalescing is
+    enabled per query name through database.coalescing in database.yaml.
+    Calls with fresh=True always run on their own, since an identical call
+    already in flight may have started before the caller's last write.
+    """
+    signature = inspect.signature(method)
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if (not get_config().database.coalescing.is_enabled(name)
+                or is_fresh(signature, (self,) + args, kwargs)):
+            return method(self, *args, **kwargs)
+
+        key = call_key(name, signature, (self,) + args, kwargs)
+        return single_flight.do(name, key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -2,24 +2,31 @@ import os
 import logging
 from pathlib import Path
 
-import psycopg
+from psycopg import sql
+
+from src.weather_api.config.loader import get_config
+from src.weather_api.database.cache import cached
+from src.weather_api.database.coalescing import coalesced
+from src.weather_api.database.routing import get_router
+from src.weather_api.database.snapshot_selection import SnapshotPolicy, forecast_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Column order of the rows passed to Database.insert_kalshi_snapshots()
+KALSHI_SNAPSHOT_COLUMNS = (
+    'captured_at', 'location', 'event_ticker', 'event_date', 'ticker', 'floor_strike', 'cap_strike',
+    'yes_bid', 'yes_ask', 'last_price', 'volume', 'open_interest', 'yes_book', 'no_book',
+)
 
-from src.weather_api.config.loader import Config
 
 class Database:
     def __init__(self):
-        self.config = Config().database_config
-
-        try:
-            self.config["user"] = os.environ.get('POSTGRES_USER')
-            self.config["password"] = os.environ.get('POSTGRES_PASSWORD')
-        except:
-            logger.info("Trouble with environment variables")
+        self.config = get_config().database
 
         self.sql_files_path = Path(__file__).parent / "sql_files"
 
-        self.conn = psycopg.connect(**self.config)
-        self.cur = self.conn.cursor()
+        # Connections are borrowed from the router's pools per query, so creating a Database is cheap
+        self.router = get_router()
 
         self.files = self.load_files()
 
@@ -34,7 +41,28 @@ class Database:
         else:
             raise AttributeError(f'Filename {query_name} not found')
 
-    def get_forecasted_highs(self, location, provider, cutoff='2025-09-06'):
+    def fetch_all(self, query, params=None, fresh=False):
+        """
+        Run a read-only query on a replica (or the primary) and return its rows.
+
+        Args:
+            query: SQL text
+            params: Query parameters
+            fresh: Read from the primary instead of a possibly lagging replica
+
+        Returns:
+            List of dictionaries keyed by column name
+        """
+        def run(conn):
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                columns = [desc[0] for desc in cur.description]
+                return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+        return self.router.execute(run, read_only=True, fresh=fresh)
+
+    @coalesced
+    def get_forecasted_highs(self, location, provider, cutoff='2025-09-06', policy=None, fresh=False):
         """
         Get forecasted daily high temperatures for a location and provider.
 
@@ -42,20 +70,45 @@ class Database:
             location: Location code (e.g., 'KNYC')
             provider: Weather data provider
             cutoff: Cutoff date (default: '2025-09-06')
+            policy: SnapshotPolicy choosing each day's forecast (default: earliest issued after 02:00)
+            fresh: Read from the primary instead of a replica (default: False)
 
         Returns:
             List of dictionaries with date and forecasted_high
         """
-        query = self.read_query('get_forecasted_highs.sql')
+        policy = policy or SnapshotPolicy()
+        query = sql.SQL(self.read_query('get_forecasted_highs.sql')).format(
+            forecast_snapshots=forecast_snapshots(policy, provider))
+        params = dict(policy.params(), locations=[location], provider=provider, cutoff=cutoff)
 
-        self.cur.execute(query, (location, cutoff, provider))
-        columns = [desc[0] for desc in self.cur.description]
-        results = []
-        for row in self.cur.fetchall():
-            results.append(dict(zip(columns, row)))
-        return results
+        return self.fetch_all(query, params, fresh=fresh)
 
-    def get_observed_highs(self, station_id, measurement_type='temperature', observation_type='max', service='CLI', start=None, end=None):
+    @cached
+    @coalesced
+    def get_consensus_forecast(self, locations, cutoff='2025-09-06', weighted=False, policy=None, fresh=False):
+        """
+        Get per-day forecast statistics across all providers for several locations in one query.
+
+        Args:
+            locations: List of location codes (e.g., ['KNYC', 'KMIA'])
+            cutoff: Cutoff date (default: '2025-09-06')
+            weighted: Also compute a mean weighted by each provider's past accuracy
+            policy: SnapshotPolicy choosing each day's forecast (default: earliest issued after 02:00)
+            fresh: Read from the primary instead of a replica (default: False)
+
+        Returns:
+            List of dictionaries with location, date, provider_count, providers, mean, median,
+            min, max, spread, stddev and weighted_mean (equal to mean unless weighted)
+        """
+        policy = policy or SnapshotPolicy()
+        query = sql.SQL(self.read_query('get_consensus_forecast.sql')).format(
+            forecast_snapshots=forecast_snapshots(policy))
+        params = dict(policy.params(), locations=list(locations), cutoff=cutoff, weighted=weighted)
+
+        return self.fetch_all(query, params, fresh=fresh)
+
+    @coalesced
+    def get_observed_highs(self, station_id, measurement_type='temperature', observation_type='max', service='CLI', start=None, end=None, fresh=False):
         """
         Get observed measurements for a station.
 
@@ -66,67 +119,106 @@ class Database:
             service: Data service (default: 'CLI')
             start: Optional start datetime
             end: Optional end datetime
+            fresh: Read from the primary instead of a replica (default: False)
 
         Returns:
             List of dictionaries with all observation fields
         """
         query = self.read_query('get_observed_highs.sql')
 
-        self.cur.execute(query, (measurement_type, observation_type, service, station_id, start, start, end, end))
-        columns = [desc[0] for desc in self.cur.description]
-        results = []
-        for row in self.cur.fetchall():
-            results.append(dict(zip(columns, row)))
-        return results
+        return self.fetch_all(query, (measurement_type, observation_type, service, station_id, start, start, end, end), fresh=fresh)
 
-    def get_most_recent_observation(self, station_id, service='CLI'):
+    @coalesced
+    def get_most_recent_observation(self, station_id, service='CLI', fresh=False):
         """
         Get the date of the most recent observation for a station.
 
         Args:
             station_id: Station ID (e.g., 'KMIA')
             service: Data service (default: 'CLI')
+            fresh: Read from the primary instead of a replica (default: False)
 
         Returns:
             List of dictionaries with most_recent_observation timestamp
         """
         query = self.read_query('get_most_recent_observation.sql')
 
-        self.cur.execute(query, (station_id, service))
-        columns = [desc[0] for desc in self.cur.description]
-        results = []
-        for row in self.cur.fetchall():
-            results.append(dict(zip(columns, row)))
-        return results
+        return self.fetch_all(query, (station_id, service), fresh=fresh)
 
-    def get_distinct_forecast_providers(self):
+    @coalesced
+    def get_distinct_forecast_providers(self, fresh=False):
         """
         Get distinct list of weather forecast providers.
 
+        Args:
+            fresh: Read from the primary instead of a replica (default: False)
+
         Returns:
             List of dictionaries with provider names
         """
         query = self.read_query('get_distinct_forecast_providers.sql')
 
-        self.cur.execute(query)
-        columns = [desc[0] for desc in self.cur.description]
-        results = []
-        for row in self.cur.fetchall():
-            results.append(dict(zip(columns, row)))
-        return results
+        return self.fetch_all(query, fresh=fresh)
 
-    def get_distinct_forecast_locations(self):
+    @coalesced
+    def get_distinct_forecast_locations(self, fresh=False):
         """
         Get distinct list of forecast locations.
 
+        Args:
+            fresh: Read from the primary instead of a replica (default: False)
+
         Returns:
             List of dictionaries with location codes
         """
         query = self.read_query('get_distinct_forecast_locations.sql')
 
-        self.cur.execute(query)
-        columns = [desc[0] for desc in self.cur.description]
-        results = []
-        for row in self.cur.fetchall():
-            results.append(dict(zip(columns, row)))
-        return results
+        return self.fetch_all(query, fresh=fresh)
+
+    def create_kalshi_snapshot_table(self):
+        """
+        Create the kalshi_market_snapshots table and its index if they do not exist.
+        """
+        query = self.read_query('create_kalshi_market_snapshots.sql')
+
+        self.router.execute(lambda conn: conn.execute(query), read_only=False)
+
+    def insert_kalshi_snapshots(self, rows):
+        """
+        Write Kalshi market snapshots in a single COPY.
+
+        Args:
+            rows: Sequence of tuples in KALSHI_SNAPSHOT_COLUMNS order
+
+        Returns:
+            Number of rows written
+        """
+        query = self.read_query('insert_kalshi_market_snapshots.sql')
+
+        def write(conn):
+            with conn.cursor() as cur:
+                with cur.copy(query) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+
+        self.router.execute(write, read_only=False)
+        return len(rows)
+
+    @coalesced
+    def get_kalshi_price_history(self, location, cutoff='2025-09-06', ticker=None, bucket_seconds=None, fresh=False):
+        """
+        Get recorded Kalshi prices per event date, aligned with get_forecasted_highs dates.
+
+        Args:
+            location: Location code (e.g., 'KNYC')
+            cutoff: Only events dated on or after this date (default: '2025-09-06')
+            ticker: Optional market ticker to restrict to
+            bucket_seconds: Optional bucket width; keeps the last snapshot per market per bucket
+            fresh: Read from the primary instead of a replica (default: False)
+
+        Returns:
+            List of dictionaries with date, ticker, strikes and prices, ordered by date, ticker and time
+        """
+        query = self.read_query('get_kalshi_price_history.sql')
+
+        return self.fetch_all(query, (bucket_seconds, bucket_seconds, bucket_seconds, location, cutoff, ticker, ticker), fresh=fresh)
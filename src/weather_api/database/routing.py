@@ -0,0 +1,221 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg
+from psycopg_pool import ConnectionPool, PoolClosed, PoolTimeout
+
+from src.weather_api.config.loader import DatabaseSettings, ReplicaSettings, get_config
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG_QUERY = (Path(__file__).parent / "sql_files" / "get_replica_lag.sql").read_text()
+
+# Errors that mean a server is unreachable rather than that the query is wrong
+CONNECTION_ERRORS = (psycopg.OperationalError, PoolTimeout)
+
+
+class Endpoint:
+    """One Postgres server: its connection pool, in-flight request count and replay lag."""
+
+    def __init__(self, name: str, pool: ConnectionPool, is_primary: bool):
+        self.name = name
+        self.pool = pool
+        self.is_primary = is_primary
+        self.outstanding = 0
+        self.requests = 0
+        self.lag_seconds: Optional[float] = 0.0 if is_primary else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'primary': self.is_primary,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'lag_seconds': self.lag_seconds,
+        }
+
+
+class ConnectionRouter:
+    """
+    Route queries between a primary and any number of read replicas.
+
+    Writes, and reads made with fresh=True, always go to the primary. Other
+    reads go to the replica with the fewest outstanding requests among those
+    whose replay lag is within replica_lag.max_seconds. Lag is measured every
+    replica_lag.check_interval_seconds by a background thread, so requests
+    only read the last measurement and never wait on a slow replica; until
+    its first measurement a replica is not used. When no replica qualifies,
+    or a replica is unreachable, the read runs on the primary.
+    """
+
+    def __init__(self, settings: DatabaseSettings, pool_factory: Callable[..., ConnectionPool] = ConnectionPool,
+                 monitor_lag: bool = True):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.primary = Endpoint(f'{settings.host}:{settings.port}',
+                                self._make_pool(pool_factory, settings, None), is_primary=True)
+        self.replicas = [
+            Endpoint(f'{replica.host}:{replica.port}',
+                     self._make_pool(pool_factory, settings, replica), is_primary=False)
+            for replica in settings.replicas
+        ]
+        self._monitor = None
+        if monitor_lag and self.replicas:
+            self._monitor = threading.Thread(target=self.monitor_lag, name='replica-lag-monitor', daemon=True)
+            self._monitor.start()
+
+    @staticmethod
+    def _make_pool(pool_factory, settings: DatabaseSettings, replica: Optional[ReplicaSettings]):
+        kwargs = settings.connection_kwargs(replica)
+        # Every statement is its own transaction so pooled connections are never left idle in transaction
+        kwargs['autocommit'] = True
+        return pool_factory(
+            kwargs=kwargs,
+            min_size=settings.pool.min_size,
+            max_size=settings.pool.max_size,
+            timeout=settings.pool.timeout_seconds,
+            name=f'{replica.host}:{replica.port}' if replica else 'primary',
+            open=True,
+        )
+
+    def pool_key(self):
+        return ConnectionRouter.pool_key_for(self.settings)
+
+    @staticmethod
+    def pool_key_for(settings: DatabaseSettings):
+        """Settings that require new pools when they change."""
+        return (tuple(sorted(settings.connection_kwargs().items())), settings.replicas, settings.pool)
+
+    def refresh_lag(self, endpoint: Endpoint):
+        """
+        Measure a replica's replay lag. An unreachable replica, or one whose
+        lag is unknown because it is not streaming from the primary, counts
+        as infinitely behind.
+        """
+        try:
+            with endpoint.pool.connection(timeout=self.settings.replica_lag.timeout_seconds) as conn:
+                lag = conn.execute(REPLICA_LAG_QUERY).fetchone()[0]
+            endpoint.lag_seconds = float('inf') if lag is None else lag
+        except CONNECTION_ERRORS as e:
+            logger.warning("Replica %s lag check failed: %s", endpoint.name, e)
+            endpoint.lag_seconds = float('inf')
+
+    def monitor_lag(self):
+        """Measure every replica's lag each check_interval_seconds until close() is called."""
+        while not self._stop.is_set():
+            for replica in self.replicas:
+                try:
+                    self.refresh_lag(replica)
+                except Exception:
+                    # Keep the thread alive; a replica whose lag can't be measured is not used
+                    logger.exception("Replica %s lag check failed", replica.name)
+                    replica.lag_seconds = float('inf')
+            self._stop.wait(self.settings.replica_lag.check_interval_seconds)
+
+    def usable(self, endpoint: Endpoint) -> bool:
+        lag = endpoint.lag_seconds
+        return lag is not None and lag <= self.settings.replica_lag.max_seconds
+
+    def choose(self, read_only: bool = True, fresh: bool = False) -> Endpoint:
+        """Pick the endpoint for a query."""
+        if read_only and not fresh and self.replicas:
+            candidates = [replica for replica in self.replicas if self.usable(replica)]
+            if candidates:
+                with self._lock:
+                    return min(candidates, key=lambda replica: (replica.outstanding, replica.requests))
+        return self.primary
+
+    def execute(self, fn: Callable[[psycopg.Connection], Any], read_only: bool = True, fresh: bool = False) -> Any:
+        """
+        Run fn with a pooled connection from the chosen endpoint.
+
+        If this router's pools were closed because get_router() replaced it
+        after a settings change, fn runs on the current router instead.
+
+        Args:
+            fn: Callable taking a connection and returning the query result
+            read_only: False for writes, which always use the primary
+            fresh: True to read from the primary, bypassing replicas
+
+        Returns:
+            fn's return value
+        """
+        try:
+            return self._execute(fn, read_only, fresh)
+        except PoolClosed:
+            router = get_router()
+            if router is self:
+                raise
+            # No connection was handed out, so nothing ran on the closed pool
+            return router.execute(fn, read_only, fresh)
+
+    def _execute(self, fn, read_only: bool, fresh: bool):
+        endpoint = self.choose(read_only, fresh)
+        try:
+            return self._run(endpoint, fn)
+        except CONNECTION_ERRORS as e:
+            if endpoint.is_primary or isinstance(e, PoolClosed):
+                raise
+            logger.warning("Replica %s failed, retrying on primary: %s", endpoint.name, e)
+            endpoint.lag_seconds = float('inf')
+            return self._run(self.primary, fn)
+
+    def _run(self, endpoint: Endpoint, fn):
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        try:
+            with endpoint.pool.connection() as conn:
+                return fn(conn)
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Outstanding and total requests and last measured lag per endpoint."""
+        with self._lock:
+            return [endpoint.stats() for endpoint in [self.primary] + self.replicas]
+
+    def close(self):
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join()
+        for endpoint in [self.primary] + self.replicas:
+            endpoint.pool.close()
+
+
+_router: Optional[ConnectionRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ConnectionRouter:
+    """
+    Get the process-wide router, rebuilding its pools if the connection,
+    replica or pool settings changed. Other settings apply in place.
+    """
+    global _router
+
+    settings = get_config().database
+    router = _router
+    if router is not None and router.settings is settings:
+        return router
+
+    with _router_lock:
+        if _router is None or _router.pool_key() != ConnectionRouter.pool_key_for(settings):
+            old, _router = _router, ConnectionRouter(settings)
+            if old is not None:
+                # Connections still checked out are closed when they are returned;
+                # queries that reach the old router afterwards are retried on the new one
+                old.close()
+        else:
+            _router.settings = settings
+        return _router
+
+
+def get_router_stats() -> List[Dict[str, Any]]:
+    """Router stats without creating pools if no query has run yet."""
+    router = _router
+    return router.stats() if router is not None else []
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from psycopg import sql
+
+SNAPSHOTS_QUERY = (Path(__file__).parent / "sql_files" / "select_forecast_snapshots.sql").read_text()
+
+EARLIEST_AFTER = 'earliest_after'
+LATEST_BEFORE = 'latest_before'
+LEAD_TIME = 'lead_time'
+
+# policy -> (filter on candidate forecast rows, order that ranks the chosen issuance first)
+POLICY_SQL = {
+    EARLIEST_AFTER: (
+        "DATE(timestamp) = DATE(end_time) AND EXTRACT(HOUR FROM timestamp) > %(hour)s",
+        "ASC",
+    ),
+    LATEST_BEFORE: (
+        "DATE(timestamp) = DATE(end_time) AND EXTRACT(HOUR FROM timestamp) < %(hour)s",
+        "DESC",
+    ),
+    LEAD_TIME: (
+        "timestamp <= DATE(end_time) - make_interval(hours => %(lead_hours)s)",
+        "DESC",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class SnapshotPolicy:
+    """
+    Which forecast issuance to use for each provider, location and day.
+
+    earliest_after: the first forecast issued on the day after `hour` o'clock
+    latest_before: the last forecast issued on the day before `hour` o'clock
+    lead_time: the last forecast issued at least `lead_hours` before the day starts
+
+    The default, earliest issued after 02:00, is the policy /forecast/highs
+    has always used.
+    """
+
+    kind: str = EARLIEST_AFTER
+    hour: int = 2
+    lead_hours: int = 24
+
+    def __post_init__(self):
+        if self.kind not in POLICY_SQL:
+            raise ValueError(f'Unknown policy {self.kind}, expected one of: {", ".join(POLICY_SQL)}')
+        if not 0 <= self.hour <= 23:
+            raise ValueError('hour must be between 0 and 23')
+        if self.lead_hours < 0:
+            raise ValueError('lead_hours must not be negative')
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str]) -> 'SnapshotPolicy':
+        """
+        Build a policy from request query parameters (policy, hour, lead_hours).
+
+        Raises:
+            ValueError: if a parameter is not valid
+        """
+        kwargs = {'kind': args.get('policy', EARLIEST_AFTER)}
+        for name in ('hour', 'lead_hours'):
+            value = args.get(name)
+            if value is not None:
+                try:
+                    kwargs[name] = int(value)
+                except ValueError:
+                    raise ValueError(f'{name} must be an integer')
+        return cls(**kwargs)
+
+    def params(self) -> Dict[str, Any]:
+        return {'hour': self.hour, 'lead_hours': self.lead_hours}
+
+
+def forecast_snapshots(policy: SnapshotPolicy, provider: Optional[str] = None) -> sql.Composed:
+    """
+    Build the snapshot selection query for a policy.
+
+    The query reads weather_forecasts once, with the location, provider and
+    cutoff filters applied in the scan, ranks each provider/location/day's
+    issuances with a window function and keeps the highest forecast
+    temperature of the chosen issuance. It returns location, provider, date
+    and forecasted_high, and expects the named parameters locations, cutoff,
+    provider (when given) and those from SnapshotPolicy.params().
+
+    Args:
+        policy: Issuance selection policy
+        provider: Restrict to one provider; None selects for every provider
+
+    Returns:
+        Composed SQL, to be run as-is or embedded in a larger query
+    """
+    policy_filter, issue_order = POLICY_SQL[policy.kind]
+    provider_filter = "AND provider = %(provider)s" if provider is not None else ""
+    return sql.SQL(SNAPSHOTS_QUERY).format(
+        provider_filter=sql.SQL(provider_filter),
+        policy_filter=sql.SQL(policy_filter),
+        issue_order=sql.SQL(issue_order),
+    )
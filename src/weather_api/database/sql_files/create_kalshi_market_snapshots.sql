@@ -0,0 +1,19 @@
+CREATE TABLE IF NOT EXISTS kalshi_market_snapshots (
+    captured_at TIMESTAMPTZ NOT NULL,
+    location TEXT NOT NULL,
+    event_ticker TEXT NOT NULL,
+    event_date DATE NOT NULL,
+    ticker TEXT NOT NULL,
+    floor_strike REAL,
+    cap_strike REAL,
+    yes_bid SMALLINT,
+    yes_ask SMALLINT,
+    last_price SMALLINT,
+    volume INTEGER,
+    open_interest INTEGER,
+    yes_book JSONB,
+    no_book JSONB
+);
+
+CREATE INDEX IF NOT EXISTS kalshi_market_snapshots_location_date_idx
+    ON kalshi_market_snapshots (location, event_date, ticker, captured_at);
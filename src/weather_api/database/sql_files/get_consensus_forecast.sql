@@ -0,0 +1,52 @@
+WITH provider_highs AS (
+    {forecast_snapshots}
+),
+-- Only read when skill weighting is requested
+observed_highs AS (
+    SELECT station_id as location, date, MAX(value) as observed_high
+    FROM observations
+    WHERE %(weighted)s
+        AND station_id = ANY(%(locations)s)
+        AND measurement_type = 'temperature'
+        AND observation_type = 'max'
+        AND service = 'CLI'
+        AND date >= %(cutoff)s
+    GROUP BY station_id, date
+),
+-- Each provider's mean absolute error over the days before this one, so weights never use the outcome being priced
+provider_skill AS (
+    SELECT ph.location, ph.provider, ph.date, ph.forecasted_high,
+        AVG(ABS(ph.forecasted_high - oh.observed_high)) OVER (
+            PARTITION BY ph.location, ph.provider
+            ORDER BY ph.date
+            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        ) as mean_abs_error
+    FROM provider_highs ph
+    LEFT JOIN observed_highs oh
+        ON oh.location = ph.location
+        AND oh.date = ph.date
+),
+-- A provider with no history gets the average error of the day's other providers,
+-- and when none has history every provider gets the same weight (the plain mean)
+provider_weights AS (
+    SELECT location, provider, date, forecasted_high,
+        1 / GREATEST(COALESCE(
+            mean_abs_error,
+            AVG(mean_abs_error) OVER (PARTITION BY location, date),
+            1
+        ), 0.1) as weight
+    FROM provider_skill
+)
+SELECT location, date,
+    COUNT(*) as provider_count,
+    ARRAY_AGG(provider ORDER BY provider) as providers,
+    AVG(forecasted_high)::float as mean,
+    PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY forecasted_high) as median,
+    MIN(forecasted_high)::float as min,
+    MAX(forecasted_high)::float as max,
+    (MAX(forecasted_high) - MIN(forecasted_high))::float as spread,
+    STDDEV_POP(forecasted_high)::float as stddev,
+    (SUM(forecasted_high * weight) / NULLIF(SUM(weight), 0))::float as weighted_mean
+FROM provider_weights
+GROUP BY location, date
+ORDER BY location, date;
@@ -0,0 +1,14 @@
+SELECT DISTINCT ON (event_date, ticker, bucket)
+    event_date as date, ticker, floor_strike, cap_strike, captured_at,
+    yes_bid, yes_ask, last_price, volume, open_interest
+FROM (
+    SELECT *,
+        CASE WHEN %s::integer IS NULL THEN captured_at
+            ELSE to_timestamp(floor(EXTRACT(EPOCH FROM captured_at) / %s::integer) * %s::integer)
+        END as bucket
+    FROM kalshi_market_snapshots
+    WHERE location = %s
+        AND event_date >= %s::date
+        AND (%s::text IS NULL OR ticker = %s)
+) snapshots
+ORDER BY event_date, ticker, bucket, captured_at DESC;
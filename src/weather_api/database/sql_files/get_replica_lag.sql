@@ -0,0 +1,10 @@
+-- Seconds this server's data is behind the primary, or NULL when that is unknown.
+-- A replica whose WAL receiver is not streaming (disconnected, or stalled past
+-- wal_receiver_timeout) replays everything it received and then looks caught up,
+-- so it counts as unknown. Reading pg_stat_wal_receiver needs pg_read_all_stats.
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END::float as replay_lag_seconds;
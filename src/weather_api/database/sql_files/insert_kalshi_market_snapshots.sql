@@ -0,0 +1,4 @@
+COPY kalshi_market_snapshots (
+    captured_at, location, event_ticker, event_date, ticker, floor_strike, cap_strike,
+    yes_bid, yes_ask, last_price, volume, open_interest, yes_book, no_book
+) FROM STDIN
@@ -0,0 +1,15 @@
+SELECT location, provider, date, MAX(temperature) as forecasted_high
+FROM (
+    SELECT location, provider, DATE(end_time) as date, temperature,
+        RANK() OVER (
+            PARTITION BY location, provider, DATE(end_time)
+            ORDER BY timestamp {issue_order}
+        ) as issue_rank
+    FROM weather_forecasts
+    WHERE location = ANY(%(locations)s)
+        {provider_filter}
+        AND timestamp > %(cutoff)s
+        AND {policy_filter}
+) candidates
+WHERE issue_rank = 1
+GROUP BY location, provider, date
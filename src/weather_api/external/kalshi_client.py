@@ -6,7 +6,7 @@ from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends import default_backend
 
-from src.weather_api.config.loader import Config
+from src.weather_api.config.loader import get_config
 
 
 def load_private_key_from_env():
@@ -36,11 +36,16 @@ def create_signature(private_key, timestamp, method, path):
     return base64.b64encode(signature).decode('utf-8')
 
 
-def get(private_key, api_key_id, path, base_url=None):
-    """Make an authenticated GET request to the Kalshi API."""
+def get(private_key, api_key_id, path, base_url=None, params=None, session=None):
+    """
+    Make an authenticated GET request to the Kalshi API.
+
+    The signature covers the path only, so query parameters go in params.
+    Pass a requests.Session to reuse connections across calls.
+    """
+    config = get_config().kalshi
     if base_url is None:
-        config = Config()
-        base_url = config.kalshi_config['base_url']
+        base_url = config.base_url
 
     timestamp = str(int(datetime.now().timestamp() * 1000))
     signature = create_signature(private_key, timestamp, "GET", path)
@@ -51,7 +56,8 @@ def get(private_key, api_key_id, path, base_url=None):
         'KALSHI-ACCESS-TIMESTAMP': timestamp
     }
 
-    return requests.get(base_url + path, headers=headers)
+    http = session if session is not None else requests
+    return http.get(base_url + path, headers=headers, params=params, timeout=config.request_timeout)
 
 
 # Helper function to get configured client credentials
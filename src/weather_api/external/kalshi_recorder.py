@@ -0,0 +1,297 @@
+import time
+import signal
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+import requests
+from psycopg.types.json import Jsonb
+
+from src.weather_api.config.loader import get_config
+from src.weather_api.database.database import Database
+from src.weather_api.external.kalshi_client import get_kalshi_credentials, get
+
+logger = logging.getLogger(__name__)
+
+MARKETS_PATH = "/trade-api/v2/markets"
+ORDERBOOK_PATH = "/trade-api/v2/markets/{ticker}/orderbook"
+
+# Seconds between the flusher thread's should_flush() checks
+FLUSH_CHECK_INTERVAL = 0.5
+
+
+def parse_event_date(event_ticker):
+    """
+    Get the date an event settles on from its ticker.
+
+    Args:
+        event_ticker: Kalshi event ticker (e.g., 'KXHIGHNY-25SEP07')
+
+    Returns:
+        date the event's high temperature is measured on
+    """
+    suffix = event_ticker.rsplit('-', 1)[-1]
+    return datetime.strptime(suffix.upper(), '%y%b%d').date()
+
+
+class SnapshotBuffer:
+    """
+    Thread-safe FIFO of snapshot rows waiting to be written.
+
+    When the buffer is full (e.g. the database is unreachable for a long
+    time) the oldest rows are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.dropped = 0
+        self._rows = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def add(self, rows):
+        with self._lock:
+            self._rows.extend(rows)
+            self._trim()
+
+    def drain(self):
+        """Remove and return all buffered rows."""
+        with self._lock:
+            rows = list(self._rows)
+            self._rows.clear()
+            return rows
+
+    def requeue(self, rows):
+        """Put rows from a failed flush back at the front of the buffer."""
+        with self._lock:
+            self._rows.extendleft(reversed(rows))
+            self._trim()
+
+    def _trim(self):
+        overflow = len(self._rows) - self.max_size
+        for _ in range(max(overflow, 0)):
+            self._rows.popleft()
+        if overflow > 0:
+            self.dropped += overflow
+            logger.warning("Snapshot buffer full, dropped %d oldest rows", overflow)
+
+
+class KalshiRecorder:
+    """
+    Periodically capture Kalshi market snapshots for every location in kalshi.yaml.
+
+    Each tick makes one markets request per location and appends one row per
+    open market to an in-memory buffer. Orderbooks cost a request per market,
+    so only orderbook_requests_per_tick of them are fetched each tick, for the
+    markets whose book is oldest; the others are recorded with top-of-book
+    prices only. A tick therefore takes about
+    (locations + orderbook_requests_per_tick) / max_requests_per_second
+    seconds regardless of how many markets are open.
+
+    A separate flusher thread writes the buffer with a single COPY once it
+    holds flush_batch_size rows or flush_interval_seconds have passed, so a
+    slow or unreachable database never delays capture. Settings are re-read
+    every tick, so kalshi.yaml edits apply without a restart.
+    """
+
+    def __init__(self, database_factory=Database, credentials=None):
+        self.database_factory = database_factory
+        self.private_key, self.api_key_id = credentials or get_kalshi_credentials()
+        self.session = requests.Session()
+        self.buffer = SnapshotBuffer(get_config().kalshi.recorder.max_buffer_size)
+        self.db = None
+        self.last_flush = time.monotonic()
+        self.retry_flush_at = 0.0
+        self.last_request = 0.0
+        self.orderbook_fetched_at = {}
+        self.stop_event = threading.Event()
+
+    def request(self, path, params=None):
+        """GET a Kalshi endpoint, spacing requests to max_requests_per_second."""
+        min_spacing = 1.0 / get_config().kalshi.recorder.max_requests_per_second
+        wait = self.last_request + min_spacing - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_request = time.monotonic()
+
+        response = get(self.private_key, self.api_key_id, path, params=params, session=self.session)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_markets(self, event_prefix):
+        """Get all open markets whose event ticker starts with event_prefix."""
+        params = {'series_ticker': event_prefix.rstrip('-'), 'status': 'open', 'limit': 1000}
+        markets = []
+        while True:
+            data = self.request(MARKETS_PATH, params)
+            markets.extend(m for m in data.get('markets', []) if m.get('event_ticker', '').startswith(event_prefix))
+            cursor = data.get('cursor')
+            if not cursor:
+                return markets
+            params = dict(params, cursor=cursor)
+
+    def fetch_orderbook(self, ticker, depth):
+        data = self.request(ORDERBOOK_PATH.format(ticker=ticker), {'depth': depth})
+        orderbook = data.get('orderbook') or {}
+        return orderbook.get('yes'), orderbook.get('no')
+
+    def snapshot_row(self, captured_at, location, market, yes_book=None, no_book=None):
+        """Build one row in KALSHI_SNAPSHOT_COLUMNS order from a market payload."""
+        return (
+            captured_at,
+            location,
+            market['event_ticker'],
+            parse_event_date(market['event_ticker']),
+            market['ticker'],
+            market.get('floor_strike'),
+            market.get('cap_strike'),
+            market.get('yes_bid'),
+            market.get('yes_ask'),
+            market.get('last_price'),
+            market.get('volume'),
+            market.get('open_interest'),
+            Jsonb(yes_book) if yes_book is not None else None,
+            Jsonb(no_book) if no_book is not None else None,
+        )
+
+    def orderbooks_due(self, tickers, limit):
+        """
+        Pick the markets whose orderbook should be fetched this tick.
+
+        Args:
+            tickers: Tickers of the currently open markets
+            limit: Maximum number of orderbooks to fetch
+
+        Returns:
+            Up to limit tickers, never-fetched and least recently fetched first
+        """
+        # Forget markets that have closed
+        self.orderbook_fetched_at = {ticker: fetched_at for ticker, fetched_at in self.orderbook_fetched_at.items()
+                                     if ticker in tickers}
+        return sorted(tickers, key=lambda ticker: self.orderbook_fetched_at.get(ticker, float('-inf')))[:limit]
+
+    def capture(self):
+        """
+        Capture one snapshot of every configured location's markets into the buffer.
+
+        A failure for one location or orderbook is logged and does not stop the others.
+
+        Returns:
+            Number of rows added to the buffer
+        """
+        config = get_config().kalshi
+        settings = config.recorder
+        self.buffer.max_size = settings.max_buffer_size
+        captured_at = datetime.now(timezone.utc)
+
+        markets = []
+        for location, location_config in config.locations.items():
+            try:
+                markets.extend((location, market) for market in self.fetch_markets(location_config['event-prefix']))
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.warning("Failed to capture Kalshi markets for %s: %s", location, e)
+
+        books = {}
+        if settings.capture_orderbook:
+            tickers = {market['ticker'] for _, market in markets if 'ticker' in market}
+            for ticker in self.orderbooks_due(tickers, settings.orderbook_requests_per_tick):
+                self.orderbook_fetched_at[ticker] = time.monotonic()
+                try:
+                    books[ticker] = self.fetch_orderbook(ticker, settings.orderbook_depth)
+                except (requests.RequestException, ValueError) as e:
+                    logger.warning("Failed to capture Kalshi orderbook for %s: %s", ticker, e)
+
+        rows = []
+        for location, market in markets:
+            try:
+                yes_book, no_book = books.get(market['ticker'], (None, None))
+                rows.append(self.snapshot_row(captured_at, location, market, yes_book, no_book))
+            except (ValueError, KeyError) as e:
+                logger.warning("Skipping malformed Kalshi market for %s: %s", location, e)
+
+        self.buffer.add(rows)
+        return len(rows)
+
+    def flush(self):
+        """
+        Write all buffered rows in one COPY.
+
+        On failure the rows are put back in the buffer, the next flush
+        starts over with a new Database (re-checking the table exists) and
+        should_flush() holds off for flush_interval_seconds.
+
+        Returns:
+            Number of rows written
+        """
+        self.last_flush = time.monotonic()
+        rows = self.buffer.drain()
+        if not rows:
+            return 0
+
+        try:
+            if self.db is None:
+                self.db = self.database_factory()
+                self.db.create_kalshi_snapshot_table()
+            return self.db.insert_kalshi_snapshots(rows)
+        except Exception as e:
+            logger.error("Failed to write %d Kalshi snapshots: %s", len(rows), e)
+            self.buffer.requeue(rows)
+            self.db = None
+            self.retry_flush_at = time.monotonic() + get_config().kalshi.recorder.flush_interval_seconds
+            return 0
+
+    def should_flush(self):
+        settings = get_config().kalshi.recorder
+        now = time.monotonic()
+        if now < self.retry_flush_at:
+            return False
+        return (len(self.buffer) >= settings.flush_batch_size
+                or now - self.last_flush >= settings.flush_interval_seconds)
+
+    def run_flusher(self):
+        """Flush whenever should_flush() says so until stop() is called."""
+        while not self.stop_event.wait(FLUSH_CHECK_INTERVAL):
+            if self.should_flush():
+                self.flush()
+
+    def run(self):
+        """Capture until stop() is called, flushing from a separate thread, then flush what is left."""
+        flusher = threading.Thread(target=self.run_flusher, name='kalshi-recorder-flush', daemon=True)
+        flusher.start()
+
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.capture()
+            except Exception:
+                logger.exception("Kalshi capture failed")
+
+            interval = get_config().kalshi.recorder.interval_seconds
+            self.stop_event.wait(max(0.0, interval - (time.monotonic() - started)))
+
+        flusher.join()
+        self.flush()
+
+    def start(self):
+        """Run the recorder in a daemon thread."""
+        thread = threading.Thread(target=self.run, name='kalshi-recorder', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    recorder = KalshiRecorder()
+    signal.signal(signal.SIGTERM, lambda signum, frame: recorder.stop())
+    try:
+        recorder.run()
+    except KeyboardInterrupt:
+        recorder.stop()
+        recorder.flush()